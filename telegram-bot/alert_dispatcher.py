@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Alert Dispatcher
+Delivers alert notifications concurrently within Telegram's rate limits
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Enable logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+DISPATCH_WORKERS = int(os.getenv("ALERT_DISPATCH_WORKERS", "8"))
+GLOBAL_RATE = 30  # Telegram allows about 30 messages per second overall
+CHAT_RATE = 1  # and about 1 message per second to the same chat
+MAX_ATTEMPTS = 5
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out send slots at a fixed rate."""
+    
+    def __init__(self, rate, capacity=None):
+        """
+        Initialize the bucket.
+        
+        Args:
+            rate (float): Tokens added per second
+            capacity (float, optional): Maximum burst size. Defaults to rate.
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        """Add the tokens earned since the last update. Call with the lock held."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self):
+        """
+        Take a token, going into debt if none is available.
+        
+        Returns:
+            float: Seconds to wait before the reserved token may be used
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+    
+    def acquire(self):
+        """Block until a token is available."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+    
+    def wait(self):
+        """Block until a token is available, without taking it."""
+        with self._lock:
+            self._refill()
+            delay = max(0.0, (1 - self.tokens) / self.rate)
+        if delay:
+            time.sleep(delay)
+    
+    def pause(self, seconds):
+        """
+        Stop handing out tokens for at least the given number of seconds.
+        
+        Pauses overlap rather than add up, so several senders reporting the same
+        flood wait do not stretch it.
+        """
+        with self._lock:
+            # Refill first so the pause is measured from now, not from the last reservation;
+            # one token is back when the pause ends
+            self._refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+class AlertDispatcher:
+    """Sends alert notifications from a bounded worker pool with rate limiting and retries."""
+    
+    def __init__(self, send_func, workers=DISPATCH_WORKERS, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE):
+        """
+        Initialize the dispatcher.
+        
+        Args:
+            send_func (callable): send_func(chat_id, text) returning the Telegram API response dict
+            workers (int): Number of concurrent senders
+            global_rate (float): Messages per second across all chats
+            chat_rate (float): Messages per second to a single chat
+        """
+        self.send_func = send_func
+        self.workers = workers
+        self.chat_rate = chat_rate
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_buckets = {}
+        self._buckets_lock = threading.Lock()
+    
+    def _chat_bucket(self, chat_id):
+        """Get the token bucket for a chat."""
+        with self._buckets_lock:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate)
+            return bucket
+    
+    def _send(self, chat_id, text, queued_at):
+        """
+        Send one message, waiting for rate limits and retrying on 429 and network errors.
+        
+        Returns:
+            dict: Delivery result
+        """
+        chat_bucket = self._chat_bucket(chat_id)
+        error = None
+        
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            # Wait for the chat first so a slow chat does not hold a global slot, but take its
+            # token only once the global slot comes up, so a long global wait (e.g. after a
+            # flood wait) does not count towards the gap before the chat's next message
+            chat_bucket.wait()
+            self.global_bucket.acquire()
+            chat_bucket.acquire()
+            
+            try:
+                response = self.send_func(chat_id, text)
+            except Exception as e:
+                error = str(e)
+                if attempt < MAX_ATTEMPTS:
+                    time.sleep(min(2 ** attempt, 30))
+                continue
+            
+            if response.get("ok", True):
+                return {
+                    "chat_id": chat_id,
+                    "ok": True,
+                    "attempts": attempt,
+                    "latency": time.monotonic() - queued_at
+                }
+            
+            error = response.get("description", "Unknown error")
+            if response.get("error_code") != 429:
+                break
+            
+            # Flood control: Telegram tells us how long to back off, but not whether the
+            # chat's limit or the bot's overall limit was hit, so hold back every send
+            retry_after = response.get("parameters", {}).get("retry_after", 1)
+            chat_bucket.pause(retry_after)
+            self.global_bucket.pause(retry_after)
+            logger.warning(f"Rate limited sending to {chat_id}, retrying after {retry_after}s")
+        
+        return {
+            "chat_id": chat_id,
+            "ok": False,
+            "attempts": attempt,
+            "latency": time.monotonic() - queued_at,
+            "error": error
+        }
+    
+    def _send_chat(self, chat_id, texts, queued_at):
+        """Send a chat's messages in order."""
+        return [self._send(chat_id, text, queued_at) for text in texts]
+    
+    def dispatch(self, messages):
+        """
+        Deliver messages and wait until every one has been sent or given up on.
+        
+        Messages to the same chat are sent in order by one worker; different chats
+        are served concurrently.
+        
+        Args:
+            messages (list): List of (chat_id, text) tuples
+        
+        Returns:
+            list: Delivery result per message with chat_id, ok, attempts and latency in seconds
+        """
+        if not messages:
+            return []
+        
+        queued_at = time.monotonic()
+        by_chat = {}
+        for chat_id, text in messages:
+            by_chat.setdefault(chat_id, []).append(text)
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(by_chat))) as executor:
+            futures = [
+                executor.submit(self._send_chat, chat_id, texts, queued_at)
+                for chat_id, texts in by_chat.items()
+            ]
+            for future in futures:
+                results.extend(future.result())
+        
+        latencies = sorted(result["latency"] for result in results)
+        failed = sum(1 for result in results if not result["ok"])
+        logger.info(
+            f"Dispatched {len(results)} alerts ({failed} failed): "
+            f"p50 {latencies[len(latencies) // 2]:.2f}s, "
+            f"p95 {latencies[int(len(latencies) * 0.95)]:.2f}s, "
+            f"max {latencies[-1]:.2f}s"
+        )
+        
+        # Forget chats that have been idle long enough to have a full bucket again
+        with self._buckets_lock:
+            now = time.monotonic()
+            self.chat_buckets = {
+                chat_id: bucket for chat_id, bucket in self.chat_buckets.items()
+                if now - bucket.updated < bucket.capacity / bucket.rate
+            }
+        
+        return results
@@ -0,0 +1,474 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Alert Storage
+Journal and SQLite persistence for price alerts
+"""
+
+import os
+import json
+import math
+import zlib
+import sqlite3
+import logging
+import secrets
+import threading
+from snapshot import load_snapshot, save_snapshot
+
+# Enable logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+def new_alert_id():
+    """Generate a stable ID for a new alert."""
+    return secrets.token_hex(8)
+
+def valid_threshold(threshold):
+    """
+    Check whether a threshold can be ordered in the threshold index.
+    
+    Args:
+        threshold: Threshold value of an alert
+    
+    Returns:
+        bool: True for a finite number; NaN and infinities cannot be sorted or crossed
+    """
+    try:
+        return math.isfinite(threshold)
+    except TypeError:
+        return False
+
+def _find_alert_id(user_alerts, record):
+    """Return the ID of the alert a record refers to, or None."""
+    if 'alert_id' in record:
+        return record['alert_id'] if record['alert_id'] in user_alerts else None
+    # Records written before alerts had IDs address them by (type, threshold)
+    for alert_id, alert in user_alerts.items():
+        if alert['type'] == record['type'] and alert['threshold'] == record['threshold']:
+            return alert_id
+    return None
+
+def apply_record(alerts, record):
+    """
+    Apply a journal record to an alerts dictionary.
+    
+    Records address alerts by ID, and applying a record twice has the same
+    effect as applying it once. This lets a journal be replayed on top of a
+    snapshot that already contains some of its records.
+    
+    Args:
+        alerts (dict): Alerts keyed by user ID, then alert ID; modified in place
+        record (dict): Journal record
+    
+    Returns:
+        bool: True if the record added an alert without an ID, which was given one
+    """
+    op = record['op']
+    user_id = record['user_id']
+    user_alerts = alerts.get(user_id, {})
+    
+    if op == 'add':
+        alert = record['alert']
+        if not valid_threshold(alert['threshold']):
+            logger.warning(f"Skipping journal record adding an alert with invalid threshold {alert['threshold']}")
+            return False
+        duplicate = any(
+            existing['type'] == alert['type'] and existing['threshold'] == alert['threshold']
+            for existing in user_alerts.values()
+        )
+        if not duplicate:
+            assigned_id = 'id' not in alert
+            if assigned_id:
+                alert['id'] = new_alert_id()
+            alerts.setdefault(user_id, {})[alert['id']] = alert
+            return assigned_id
+    elif op == 'remove':
+        alert_id = _find_alert_id(user_alerts, record)
+        if alert_id is not None:
+            del user_alerts[alert_id]
+            if not user_alerts:
+                del alerts[user_id]
+    elif op == 'update':
+        alert_id = _find_alert_id(user_alerts, record)
+        if alert_id is not None:
+            user_alerts[alert_id]['triggered'] = record['triggered']
+            user_alerts[alert_id]['last_triggered'] = record['last_triggered']
+    else:
+        logger.warning(f"Unknown journal operation: {op}")
+    return False
+
+class AlertJournal:
+    """Append-only journal of alert mutations with background compaction."""
+    
+    def __init__(self, journal_file, snapshot_file, snapshot_func, compact_threshold=1000):
+        """
+        Initialize the journal.
+        
+        Args:
+            journal_file (str): File that records are appended to
+            snapshot_file (str): Data file the journal is compacted into (JSON or binary snapshot)
+            snapshot_func (callable): Returns a JSON-serializable copy of the current alerts
+            compact_threshold (int): Number of records that triggers a compaction
+        """
+        self.journal_file = journal_file
+        self.snapshot_file = snapshot_file
+        self.snapshot_func = snapshot_func
+        self.compact_threshold = compact_threshold
+        self.record_count = 0
+        self.assigned_ids = False  # Whether replay gave IDs to alerts from older records
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()  # Serializes compactions, which share temp files
+        self._compacting = False
+    
+    @staticmethod
+    def _encode(record):
+        """Encode a record as a checksummed journal line."""
+        payload = json.dumps(record, separators=(',', ':'))
+        return f"{zlib.crc32(payload.encode('utf-8')):08x} {payload}\n"
+    
+    @staticmethod
+    def _decode(line):
+        """Decode a journal line, returning None if it is torn or corrupt."""
+        if not line.endswith('\n'):
+            return None
+        checksum, _, payload = line.rstrip('\n').partition(' ')
+        try:
+            if int(checksum, 16) != zlib.crc32(payload.encode('utf-8')):
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+    
+    def replay(self, alerts):
+        """
+        Replay the journal on top of a snapshot.
+        
+        Replay stops at the first torn or corrupt record, which can only be the
+        tail of an interrupted write. The file is truncated there so later
+        appends start on a clean line.
+        
+        Args:
+            alerts (dict): Snapshot alerts keyed by user ID, then alert ID; modified in place
+        
+        Returns:
+            dict: The updated alerts
+        """
+        if not os.path.exists(self.journal_file):
+            return alerts
+        
+        good_offset = 0
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in iter(f.readline, ''):
+                record = self._decode(line)
+                if record is None:
+                    logger.warning(f"Discarding torn journal tail at byte {good_offset} of {self.journal_file}")
+                    break
+                if apply_record(alerts, record):
+                    self.assigned_ids = True
+                self.record_count += 1
+                good_offset = f.tell()
+        
+        if good_offset != os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(good_offset)
+        
+        return alerts
+    
+    def append(self, records):
+        """
+        Durably append records to the journal.
+        
+        Args:
+            records (list): Journal records to append
+        """
+        if not records:
+            return
+        
+        data = ''.join(self._encode(record) for record in records)
+        with self._lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self.record_count += len(records)
+            start_compaction = self.record_count >= self.compact_threshold and not self._compacting
+            if start_compaction:
+                self._compacting = True
+        
+        if start_compaction:
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+    
+    def _compact_in_background(self):
+        """Run a compaction and clear the in-progress flag."""
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Error compacting alerts journal: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+    
+    def compact(self):
+        """
+        Fold the journal into the snapshot file.
+        
+        The snapshot is written to a temporary file and renamed into place, and
+        only then are the records it covers dropped from the journal. A crash at
+        any point leaves a snapshot plus a journal that replays to the same state.
+        """
+        with self._compact_lock:
+            self._compact()
+    
+    def _compact(self):
+        """Compact while holding the compaction lock."""
+        with self._lock:
+            snapshot = self.snapshot_func()
+            covered_offset = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+            covered_count = self.record_count
+        
+        save_snapshot(self.snapshot_file, snapshot)
+        
+        with self._lock:
+            # Keep records appended while the snapshot was being written
+            tail = b''
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, 'rb') as f:
+                    f.seek(covered_offset)
+                    tail = f.read()
+            
+            tmp_path = f"{self.journal_file}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_file)
+            self.record_count -= covered_count
+        
+        logger.info(f"Compacted {covered_count} journal records into {self.snapshot_file}")
+
+class SQLiteAlertStore:
+    """Alert storage in a SQLite database, queried through indexes instead of held in memory."""
+    
+    COLUMNS = "alert_id, user_id, type, threshold, chat_id, created_at, triggered, last_triggered"
+    
+    def __init__(self, db_file):
+        """
+        Open (and if needed create) the alerts database.
+        
+        Args:
+            db_file (str): Path to the SQLite database file
+        """
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        # The connection is shared by the polling loop and the price alert thread
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY,
+                    alert_id TEXT,
+                    user_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    threshold REAL NOT NULL,
+                    chat_id,
+                    created_at REAL,
+                    triggered INTEGER NOT NULL DEFAULT 0,
+                    last_triggered REAL
+                )
+            """)
+            # Also serves lookups by user_id alone, and rejects duplicate alerts
+            self.conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_user ON alerts (user_id, type, threshold)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_alerts_type_threshold ON alerts (type, threshold)"
+            )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._add_alert_ids()
+    
+    def _add_alert_ids(self):
+        """Give stable IDs to alerts in databases created before alerts had them."""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(alerts)")]
+        if 'alert_id' not in columns:
+            self.conn.execute("ALTER TABLE alerts ADD COLUMN alert_id TEXT")
+        
+        rows = self.conn.execute("SELECT id FROM alerts WHERE alert_id IS NULL").fetchall()
+        self.conn.executemany(
+            "UPDATE alerts SET alert_id = ? WHERE id = ?",
+            [(new_alert_id(), row_id) for row_id, in rows]
+        )
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_alert_id ON alerts (alert_id)")
+    
+    @staticmethod
+    def _row_to_alert(row):
+        """Convert a database row to an (alert_id, (user_id, alert)) entry."""
+        alert_id, user_id, alert_type, threshold, chat_id, created_at, triggered, last_triggered = row
+        return alert_id, (user_id, {
+            'id': alert_id,
+            'type': alert_type,
+            'threshold': threshold,
+            'chat_id': chat_id,
+            'created_at': created_at,
+            'triggered': bool(triggered),
+            'last_triggered': last_triggered
+        })
+    
+    def _query(self, sql, params=()):
+        """Run a query and return its rows as (alert_id, (user_id, alert)) entries."""
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {self.COLUMNS} FROM alerts {sql}", params).fetchall()
+        return [self._row_to_alert(row) for row in rows]
+    
+    def migrate_from_json(self, json_file):
+        """
+        Import alerts from a JSON alerts file, once per database.
+        
+        Args:
+            json_file (str): Path to the JSON alerts file (or its binary snapshot)
+        
+        Returns:
+            int: Number of alerts imported
+        """
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone():
+                return 0
+            alerts = load_snapshot(json_file)
+            if alerts is None:
+                return 0
+            
+            with self.conn:
+                rows = [
+                    (alert.get('id') or new_alert_id(), user_id, alert['type'], alert['threshold'],
+                     alert.get('chat_id'), alert.get('created_at'), int(bool(alert.get('triggered'))),
+                     alert.get('last_triggered'))
+                    for user_id, user_alerts in alerts.items()
+                    for alert in user_alerts
+                ]
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO alerts "
+                    "(alert_id, user_id, type, threshold, chat_id, created_at, triggered, last_triggered) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from', ?)", (json_file,))
+        
+        logger.info(f"Migrated {len(rows)} alerts from {json_file} to {self.db_file}")
+        return len(rows)
+    
+    def add(self, user_id, alert):
+        """
+        Insert an alert unless the user already has one with the same type and threshold.
+        
+        Args:
+            user_id (str): Telegram user ID
+            alert (dict): Alert data, including its ID
+        
+        Returns:
+            bool: True if the alert was inserted, False if it is a duplicate
+        """
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO alerts "
+                "(alert_id, user_id, type, threshold, chat_id, created_at, triggered, last_triggered) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (alert['id'], user_id, alert['type'], alert['threshold'], alert['chat_id'],
+                 alert['created_at'], int(alert['triggered']), alert['last_triggered'])
+            )
+        return cursor.rowcount > 0
+    
+    def remove(self, user_id, alert_id):
+        """
+        Delete a user's alert by ID.
+        
+        Args:
+            user_id (str): Telegram user ID
+            alert_id (str): ID of the alert to remove
+        
+        Returns:
+            bool: True if the alert was removed, False if there is no such alert
+        """
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM alerts WHERE alert_id = ? AND user_id = ?",
+                (alert_id, user_id)
+            )
+        return cursor.rowcount > 0
+    
+    def get_user_alerts(self, user_id):
+        """Return a user's alerts in creation order."""
+        return [alert for _, (_, alert) in self._query("WHERE user_id = ? ORDER BY id", (user_id,))]
+    
+    def get_all_alerts(self):
+        """Return every alert, keyed by user ID."""
+        alerts = {}
+        for _, (user_id, alert) in self._query("ORDER BY user_id, id"):
+            alerts.setdefault(user_id, []).append(alert)
+        return alerts
+    
+    def between(self, alert_type, low, high, include_low=False, include_high=True):
+        """
+        Return the alerts of one type whose threshold lies between low and high.
+        
+        Args:
+            alert_type (str): Alert type
+            low (float): Lower bound, or None for no lower bound
+            high (float): Upper bound
+            include_low (bool): Whether the lower bound is inclusive
+            include_high (bool): Whether the upper bound is inclusive
+        
+        Returns:
+            list: List of (alert_id, (user_id, alert)) entries
+        """
+        sql = "WHERE type = ? AND threshold " + ("<= ?" if include_high else "< ?")
+        params = [alert_type, high]
+        if low is not None:
+            sql += " AND threshold " + (">= ?" if include_low else "> ?")
+            params.append(low)
+        return self._query(sql, params)
+    
+    def mismatched(self, current_price, levels):
+        """
+        Return the alerts whose triggered flag does not match the given prices.
+        
+        Args:
+            current_price (float): Current price of the token
+            levels (dict): Percent change alert type -> absolute percent change, or None if unknown
+        
+        Returns:
+            list: List of (alert_id, (user_id, alert)) entries
+        """
+        entries = self._query(
+            "WHERE type = 'price_above' AND ((threshold <= ? AND triggered = 0) OR (threshold > ? AND triggered = 1))",
+            (current_price, current_price)
+        )
+        entries += self._query(
+            "WHERE type = 'price_below' AND ((threshold >= ? AND triggered = 0) OR (threshold < ? AND triggered = 1))",
+            (current_price, current_price)
+        )
+        for alert_type, level in levels.items():
+            if level is None:
+                entries += self._query("WHERE type = ? AND triggered = 1", (alert_type,))
+            else:
+                entries += self._query(
+                    "WHERE type = ? AND ((threshold <= ? AND triggered = 0) OR (threshold > ? AND triggered = 1))",
+                    (alert_type, level, level)
+                )
+        return entries
+    
+    def update_states(self, changes):
+        """
+        Store the triggered state of changed alerts in one transaction.
+        
+        Args:
+            changes (list): List of (alert_id, alert) tuples
+        """
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE alerts SET triggered = ?, last_triggered = ? WHERE alert_id = ?",
+                [(int(alert['triggered']), alert['last_triggered'], alert_id) for alert_id, alert in changes]
+            )
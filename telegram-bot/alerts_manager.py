@@ -7,11 +7,22 @@ Manages price alerts for users
 """
 
 import os
-import json
 import time
+import bisect
 import logging
+import threading
 from dotenv import load_dotenv
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batches then fall back to per-tick checks
+    np = None
+
+from alert_storage import AlertJournal, SQLiteAlertStore, new_alert_id, valid_threshold
+from price_window import PriceWindow
+from snapshot import load_snapshot, save_snapshot
+from striped_lock import StripedLock
+
 # Load environment variables
 load_dotenv()
 
@@ -23,40 +34,236 @@ logger = logging.getLogger(__name__)
 
 # Constants
 ALERTS_FILE = "user_alerts.json"
+ALERTS_JOURNAL_FILE = "user_alerts.journal"
+ALERTS_DB_FILE = "user_alerts.db"
+ALERTS_STORAGE = os.getenv("ALERTS_STORAGE", "json")  # 'json', 'journal' or 'sqlite'
+ALERTS_JOURNAL_COMPACT_THRESHOLD = int(os.getenv("ALERTS_JOURNAL_COMPACT_THRESHOLD", "1000"))
+# Rolling-window percent change alerts: type -> (window in seconds, description)
+WINDOWED_ALERT_TYPES = {
+    'percent_change_15m': (900, '15 minutes'),
+    'percent_change_1h': (3600, '1 hour'),
+    'percent_change_4h': (14400, '4 hours')
+}
+# Alert types triggered by an absolute percent change reaching the threshold
+CHANGE_ALERT_TYPES = ('percent_change',) + tuple(WINDOWED_ALERT_TYPES)
+ALERT_TYPES = ('price_above', 'price_below') + CHANGE_ALERT_TYPES
+PRICE_WINDOW_CAPACITY = 4096  # Price ticks kept for windowed alerts
+BATCH_CHUNK_SIZE = 4096  # Alerts evaluated per vectorized block in check_alerts_batch
+ALERT_LOCK_STRIPES = 64  # Per-user locks shared out by user ID
 
-class AlertsManager:
-    """Manages price alerts for users."""
+class ThresholdIndex:
+    """Sorted thresholds for one alert type, bucketed by threshold value."""
     
     def __init__(self):
-        """Initialize the alerts manager."""
-        self.alerts = self._load_alerts()
+        """Initialize an empty index."""
+        self.thresholds = []  # Sorted distinct thresholds
+        self.buckets = {}  # threshold -> {alert key: (user_id, alert)}
+    
+    def add(self, threshold, key, user_id, alert):
+        """Add an alert to the bucket for its threshold."""
+        bucket = self.buckets.get(threshold)
+        if bucket is None:
+            bucket = self.buckets[threshold] = {}
+            bisect.insort(self.thresholds, threshold)
+        bucket[key] = (user_id, alert)
+    
+    def remove(self, threshold, key):
+        """Remove an alert, dropping its bucket once it is empty."""
+        bucket = self.buckets.get(threshold)
+        if bucket is None:
+            return
+        bucket.pop(key, None)
+        if not bucket:
+            del self.buckets[threshold]
+            position = bisect.bisect_left(self.thresholds, threshold)
+            # Only delete an exact match, so a threshold bisect cannot place never removes another
+            if position < len(self.thresholds) and self.thresholds[position] == threshold:
+                del self.thresholds[position]
+    
+    def between(self, low, high, include_low=False, include_high=True):
+        """
+        Yield the alerts whose threshold lies between low and high.
+        
+        Args:
+            low (float): Lower bound, or None for no lower bound
+            high (float): Upper bound
+            include_low (bool): Whether the lower bound is inclusive
+            include_high (bool): Whether the upper bound is inclusive
+        """
+        if low is None:
+            start = 0
+        elif include_low:
+            start = bisect.bisect_left(self.thresholds, low)
+        else:
+            start = bisect.bisect_right(self.thresholds, low)
+        
+        if include_high:
+            end = bisect.bisect_right(self.thresholds, high)
+        else:
+            end = bisect.bisect_left(self.thresholds, high)
+        
+        for threshold in self.thresholds[start:end]:
+            for key, entry in self.buckets[threshold].items():
+                yield key, entry
+
+class AlertsManager:
+    """
+    Manages price alerts for users.
+    
+    Safe for concurrent use. Adding and removing alerts takes the user's lock
+    stripe, so different users rarely wait on each other, plus a short lock on
+    the shared threshold index. Each user's alert dict is replaced rather than
+    changed in place, so readers never lock and always see a consistent copy.
+    """
+    
+    def __init__(self, storage=None):
+        """
+        Initialize the alerts manager.
+        
+        Args:
+            storage (str, optional): 'json' to rewrite ALERTS_FILE on every change,
+                'journal' to append changes to ALERTS_JOURNAL_FILE, or 'sqlite' to keep
+                alerts in ALERTS_DB_FILE instead of memory. Defaults to ALERTS_STORAGE.
+        """
+        storage = storage or ALERTS_STORAGE
+        self._user_locks = StripedLock(ALERT_LOCK_STRIPES)  # Serializes changes to one user's alerts
+        self._index_lock = threading.RLock()  # Guards the index, pending alerts and triggered flags
+        self._check_lock = threading.RLock()  # Keeps checks, and the changes they store, in order
+        self._save_lock = threading.Lock()  # Keeps saves of the alerts file from overlapping
+        self.journal = None
+        self.db = None
+        if storage == 'journal':
+            self.journal = AlertJournal(
+                ALERTS_JOURNAL_FILE,
+                ALERTS_FILE,
+                self._snapshot_alerts,
+                ALERTS_JOURNAL_COMPACT_THRESHOLD
+            )
+        elif storage == 'sqlite':
+            self.db = SQLiteAlertStore(ALERTS_DB_FILE)
+            self.db.migrate_from_json(ALERTS_FILE)
+        
+        # Alerts whose triggered flag may not match the last checked price
+        self.pending = {}
+        # Price and absolute percent changes seen by the last check, None until the first check
+        self.last_price = None
+        self.last_changes = {}
+        self.price_window = PriceWindow(
+            [window for window, _ in WINDOWED_ALERT_TYPES.values()],
+            PRICE_WINDOW_CAPACITY
+        )
+        
+        if self.db:
+            self.alerts = None
+            self.index = None
+        else:
+            # Alerts keyed by user ID, then by alert ID in creation order
+            self.alerts = self._load_alerts()
+            self._build_index()
     
     def _load_alerts(self):
         """Load alerts from file."""
         try:
-            if os.path.exists(ALERTS_FILE):
-                with open(ALERTS_FILE, 'r') as f:
-                    return json.load(f)
-            return {}
+            stored = load_snapshot(ALERTS_FILE) or {}
+            
+            # Alerts saved before IDs existed get one now, and the file is rewritten to keep it;
+            # alerts with a threshold that cannot be indexed are dropped the same way
+            missing_ids = False
+            alerts = {}
+            for user_id, user_alerts in stored.items():
+                alerts[user_id] = {}
+                for alert in user_alerts:
+                    if not valid_threshold(alert.get('threshold')):
+                        logger.warning(f"Dropping alert of user {user_id} with invalid threshold {alert.get('threshold')}")
+                        missing_ids = True  # Rewrite the file without it
+                        continue
+                    if 'id' not in alert:
+                        alert['id'] = new_alert_id()
+                        missing_ids = True
+                    alerts[user_id][alert['id']] = alert
+            
+            if self.journal:
+                self.journal.replay(alerts)
+                missing_ids = missing_ids or self.journal.assigned_ids
+            
+            if missing_ids:
+                self.alerts = alerts
+                if self.journal:
+                    self.journal.compact()
+                else:
+                    self._save_alerts()
+            return alerts
         except Exception as e:
             logger.error(f"Error loading alerts: {e}")
             return {}
     
+    def _snapshot_alerts(self):
+        """Return a copy of all alerts in file format that is safe to serialize from another thread."""
+        return {
+            user_id: [dict(alert) for alert in list(user_alerts.values())]
+            for user_id, user_alerts in dict(self.alerts).items()
+        }
+    
+    def _build_index(self):
+        """Build the threshold index and duplicate key sets from the loaded alerts."""
+        self.index = {alert_type: ThresholdIndex() for alert_type in ALERT_TYPES}
+        # User ID -> {(type, threshold): alert ID}, for O(1) duplicate detection
+        self.alert_ids = {}
+        
+        for user_id, user_alerts in self.alerts.items():
+            for alert in user_alerts.values():
+                self._index_alert(user_id, alert)
+    
+    def _index_alert(self, user_id, alert):
+        """Add an alert to the threshold index and the user's key set."""
+        index = self.index.get(alert['type'])
+        if index is not None:
+            index.add(alert['threshold'], alert['id'], user_id, alert)
+        self.alert_ids.setdefault(user_id, {})[(alert['type'], alert['threshold'])] = alert['id']
+        self.pending[alert['id']] = (user_id, alert)
+    
+    def _unindex_alert(self, user_id, alert):
+        """Remove an alert from the threshold index and the user's key set."""
+        index = self.index.get(alert['type'])
+        if index is not None:
+            index.remove(alert['threshold'], alert['id'])
+        user_keys = self.alert_ids.get(user_id, {})
+        user_keys.pop((alert['type'], alert['threshold']), None)
+        if not user_keys:
+            self.alert_ids.pop(user_id, None)
+        self.pending.pop(alert['id'], None)
+    
     def _save_alerts(self):
         """Save alerts to file."""
         try:
-            with open(ALERTS_FILE, 'w') as f:
-                json.dump(self.alerts, f, indent=2)
+            with self._save_lock:
+                save_snapshot(ALERTS_FILE, self._snapshot_alerts())
         except Exception as e:
             logger.error(f"Error saving alerts: {e}")
     
+    def _persist(self, records):
+        """
+        Persist alert changes.
+        
+        Args:
+            records (list): Journal records describing the changes
+        """
+        if not self.journal:
+            self._save_alerts()
+            return
+        
+        try:
+            self.journal.append(records)
+        except Exception as e:
+            logger.error(f"Error appending to alerts journal: {e}")
+    
     def add_alert(self, user_id, alert_type, threshold, chat_id=None):
         """
         Add a new alert for a user.
         
         Args:
             user_id (int): Telegram user ID
-            alert_type (str): Type of alert ('price_above', 'price_below', 'percent_change')
+            alert_type (str): Type of alert (one of ALERT_TYPES)
             threshold (float): Threshold value for the alert
             chat_id (int, optional): Chat ID to send the alert to. Defaults to user_id.
         
@@ -65,54 +272,83 @@ class AlertsManager:
         """
         user_id = str(user_id)  # Convert to string for JSON serialization
         chat_id = chat_id or user_id
+        if not valid_threshold(threshold):
+            logger.warning(f"Rejecting alert of user {user_id} with invalid threshold {threshold}")
+            return False
         
-        if user_id not in self.alerts:
-            self.alerts[user_id] = []
-        
-        # Check if this alert already exists
-        for alert in self.alerts[user_id]:
-            if alert['type'] == alert_type and alert['threshold'] == threshold:
-                return False
-        
-        # Add the new alert
-        self.alerts[user_id].append({
+        alert = {
+            'id': new_alert_id(),
             'type': alert_type,
             'threshold': threshold,
             'chat_id': chat_id,
             'created_at': time.time(),
             'triggered': False,
             'last_triggered': None
-        })
+        }
         
-        self._save_alerts()
+        if self.db:
+            # The database's unique index rejects duplicates
+            if not self.db.add(user_id, alert):
+                return False
+            with self._index_lock:
+                self.pending[alert['id']] = (user_id, alert)
+            return True
+        
+        with self._user_locks.lock(user_id):
+            # Check if this alert already exists
+            if (alert_type, threshold) in self.alert_ids.get(user_id, {}):
+                return False
+            
+            # Add the new alert to a copy, so readers of the old dict are unaffected
+            user_alerts = dict(self.alerts.get(user_id, {}))
+            user_alerts[alert['id']] = alert
+            with self._index_lock:
+                self.alerts[user_id] = user_alerts
+                self._index_alert(user_id, alert)
+            
+            self._persist([{'op': 'add', 'user_id': user_id, 'alert': alert}])
         return True
     
-    def remove_alert(self, user_id, alert_index):
+    def remove_alert(self, user_id, alert_id):
         """
         Remove an alert for a user.
         
         Args:
             user_id (int): Telegram user ID
-            alert_index (int): Index of the alert to remove
+            alert_id (str): ID of the alert to remove. An int is treated as the
+                alert's position in get_user_alerts, which shifts after removals.
         
         Returns:
             bool: True if the alert was removed successfully, False otherwise
         """
         user_id = str(user_id)
         
-        if user_id not in self.alerts:
-            return False
-        
-        if alert_index < 0 or alert_index >= len(self.alerts[user_id]):
-            return False
-        
-        self.alerts[user_id].pop(alert_index)
+        if isinstance(alert_id, int):
+            user_alerts = self.get_user_alerts(user_id)
+            if alert_id < 0 or alert_id >= len(user_alerts):
+                return False
+            alert_id = user_alerts[alert_id]['id']
         
-        # Remove the user entry if they have no more alerts
-        if not self.alerts[user_id]:
-            del self.alerts[user_id]
+        if self.db:
+            with self._index_lock:
+                self.pending.pop(alert_id, None)
+            return self.db.remove(user_id, alert_id)
         
-        self._save_alerts()
+        with self._user_locks.lock(user_id):
+            user_alerts = dict(self.alerts.get(user_id, {}))
+            alert = user_alerts.pop(alert_id, None)
+            if alert is None:
+                return False
+            
+            with self._index_lock:
+                # Remove the user entry if they have no more alerts
+                if user_alerts:
+                    self.alerts[user_id] = user_alerts
+                else:
+                    self.alerts.pop(user_id, None)
+                self._unindex_alert(user_id, alert)
+            
+            self._persist([{'op': 'remove', 'user_id': user_id, 'alert_id': alert_id}])
         return True
     
     def get_user_alerts(self, user_id):
@@ -123,32 +359,38 @@ class AlertsManager:
             user_id (int): Telegram user ID
         
         Returns:
-            list: List of alerts for the user
+            list: Copies of the user's alerts
         """
         user_id = str(user_id)
-        return self.alerts.get(user_id, [])
+        if self.db:
+            return self.db.get_user_alerts(user_id)
+        return [dict(alert) for alert in self.alerts.get(user_id, {}).values()]
     
     def get_all_alerts(self):
         """
         Get all alerts for all users.
         
         Returns:
-            dict: Dictionary of all alerts
+            dict: Copies of all alerts, as lists keyed by user ID
         """
-        return self.alerts
+        if self.db:
+            return self.db.get_all_alerts()
+        return self._snapshot_alerts()
     
-    def check_alerts(self, current_price, previous_price=None):
+    def check_alerts(self, current_price, previous_price=None, timestamp=None):
         """
         Check all alerts against the current price.
         
         Args:
             current_price (float): Current price of the token
             previous_price (float, optional): Previous price of the token for percent change alerts
+            timestamp (float, optional): Time of the price for windowed alerts. Defaults to now.
         
         Returns:
             list: List of triggered alerts with user_id and alert details
         """
         triggered_alerts = []
+        changes = []
         
         try:
             current_price = float(current_price)
@@ -158,39 +400,309 @@ class AlertsManager:
             logger.error(f"Invalid price values: current={current_price}, previous={previous_price}")
             return triggered_alerts
         
-        for user_id, user_alerts in self.alerts.items():
-            for i, alert in enumerate(user_alerts):
-                triggered = False
+        with self._check_lock:
+            with self._index_lock:
+                percent_changes = self._percent_changes(current_price, previous_price, timestamp)
+                levels = {alert_type: change for alert_type, (change, _) in percent_changes.items()}
                 
-                if alert['type'] == 'price_above' and current_price >= alert['threshold']:
-                    triggered = True
-                elif alert['type'] == 'price_below' and current_price <= alert['threshold']:
-                    triggered = True
-                elif alert['type'] == 'percent_change' and previous_price is not None:
-                    percent_change = ((current_price - previous_price) / previous_price) * 100
-                    if abs(percent_change) >= alert['threshold']:
+                for alert_id, (user_id, alert) in self._candidate_alerts(current_price, levels).items():
+                    triggered = False
+                    
+                    if alert['type'] == 'price_above' and current_price >= alert['threshold']:
                         triggered = True
+                    elif alert['type'] == 'price_below' and current_price <= alert['threshold']:
+                        triggered = True
+                    elif alert['type'] in levels and levels[alert['type']] is not None:
+                        if levels[alert['type']] >= alert['threshold']:
+                            triggered = True
+                    
+                    if triggered and not alert['triggered']:
+                        # Mark the alert as triggered
+                        alert['triggered'] = True
+                        alert['last_triggered'] = time.time()
+                        
+                        triggered_alerts.append({
+                            'user_id': user_id,
+                            'chat_id': alert['chat_id'],
+                            'alert': alert,
+                            'current_price': current_price,
+                            # Windowed alerts compare against the window's low or high instead
+                            'previous_price': percent_changes.get(alert['type'], (None, previous_price))[1]
+                        })
+                        changes.append((alert_id, user_id, alert))
+                    elif not triggered and alert['triggered']:
+                        # Reset the triggered flag if the condition is no longer met
+                        alert['triggered'] = False
+                        changes.append((alert_id, user_id, alert))
                 
-                if triggered and not alert['triggered']:
-                    # Mark the alert as triggered
-                    self.alerts[user_id][i]['triggered'] = True
-                    self.alerts[user_id][i]['last_triggered'] = time.time()
+                self.pending = {}
+                self.last_price = current_price
+                self.last_changes = levels
+            
+            self._store_changes(changes, triggered_alerts)
+        return triggered_alerts
+    
+    def _percent_changes(self, current_price, previous_price, timestamp=None):
+        """
+        Record a price tick and compute the percent change for each change alert type.
+        
+        Args:
+            current_price (float): Current price of the token
+            previous_price (float): Previous price, or None if unknown
+            timestamp (float, optional): Time of the price. Defaults to now.
+        
+        Returns:
+            dict: Alert type -> (absolute percent change or None, reference price);
+                the percent change is None when the previous price is unknown or not positive
+        """
+        percent_change = None
+        if previous_price is not None and previous_price > 0:  # No change can be computed from a zero price
+            percent_change = abs(((current_price - previous_price) / previous_price) * 100)
+        percent_changes = {'percent_change': (percent_change, previous_price)}
+        
+        timestamp = time.time() if timestamp is None else timestamp
+        self.price_window.push(timestamp, current_price)
+        for alert_type, (window, _) in WINDOWED_ALERT_TYPES.items():
+            # As of this tick, which a backfill may have inserted before later live ticks
+            percent_changes[alert_type] = self.price_window.change(window, timestamp)
+        
+        return percent_changes
+    
+    def check_alerts_batch(self, ticks, previous_price=None):
+        """
+        Check all alerts against a batch of price ticks, e.g. to catch up after downtime.
+        
+        Equivalent to calling check_alerts for every tick in order, except that each
+        alert is reported at most once, at its first crossing. With NumPy available,
+        every alert is evaluated against all ticks in one vectorized pass.
+        
+        Args:
+            ticks (list): List of (timestamp, price) tuples
+            previous_price (float, optional): Price before the first tick for percent change alerts
+        
+        Returns:
+            list: List of triggered alerts, each with the timestamp of its first crossing
+        """
+        try:
+            ticks = sorted((float(timestamp), float(price)) for timestamp, price in ticks)
+            if previous_price is not None:
+                previous_price = float(previous_price)
+        except (ValueError, TypeError):
+            logger.error(f"Invalid price ticks: previous={previous_price}")
+            return []
+        
+        if not ticks:
+            return []
+        with self._check_lock:
+            if np is None:
+                return self._check_alerts_sequential(ticks, previous_price)
+            
+            with self._index_lock:
+                timestamps = np.array([timestamp for timestamp, _ in ticks])
+                prices = np.array([price for _, price in ticks])
+                previous_prices = np.concatenate(([np.nan if previous_price is None else previous_price], prices[:-1]))
+                # As in _percent_changes, a change from a zero or negative price is unknown
+                divisors = np.where(previous_prices > 0, previous_prices, np.nan)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    percent_changes = np.abs((prices - divisors) / divisors * 100)
+                
+                # Condition series and reference prices per alert type; NaN (unknown change) never meets a threshold.
+                # Like check_alerts, price and percent change alerts report the tick before as the previous price.
+                series = {'price_above': prices, 'price_below': prices, 'percent_change': percent_changes}
+                references = {alert_type: previous_prices for alert_type in series}
+                window_series = {alert_type: [] for alert_type in WINDOWED_ALERT_TYPES}
+                for timestamp, price in ticks:
+                    self.price_window.push(timestamp, price)
+                    for alert_type, (window, _) in WINDOWED_ALERT_TYPES.items():
+                        window_series[alert_type].append(self.price_window.change(window, timestamp))
+                for alert_type, values in window_series.items():
+                    series[alert_type] = np.array([change for change, _ in values], dtype=float)
+                    references[alert_type] = np.array([reference for _, reference in values], dtype=float)
+                
+                candidates = self._batch_candidate_alerts(prices.tolist(), {
+                    alert_type: [None if np.isnan(change) else change for change in series[alert_type].tolist()]
+                    for alert_type in CHANGE_ALERT_TYPES
+                })
+                by_type = {}
+                for alert_id, (user_id, alert) in candidates.items():
+                    if alert['type'] in series:
+                        by_type.setdefault(alert['type'], []).append((alert_id, user_id, alert))
+                
+                triggered_alerts = []
+                changes = []
+                for alert_type, entries in by_type.items():
+                    thresholds = np.array([alert['threshold'] for _, _, alert in entries], dtype=float)
+                    states = np.array([alert['triggered'] for _, _, alert in entries], dtype=bool)
                     
-                    triggered_alerts.append({
-                        'user_id': user_id,
-                        'chat_id': alert['chat_id'],
-                        'alert': alert,
-                        'current_price': current_price,
-                        'previous_price': previous_price
-                    })
-                elif not triggered:
-                    # Reset the triggered flag if the condition is no longer met
-                    self.alerts[user_id][i]['triggered'] = False
-        
-        if triggered_alerts:
+                    for start in range(0, len(entries), BATCH_CHUNK_SIZE):
+                        end = start + BATCH_CHUNK_SIZE
+                        block = thresholds[start:end, None]
+                        # One row per alert, one column per tick
+                        if alert_type == 'price_below':
+                            met = series[alert_type][None, :] <= block
+                        else:
+                            met = series[alert_type][None, :] >= block
+                        was_met = np.concatenate((states[start:end, None], met[:, :-1]), axis=1)
+                        fired = met & ~was_met
+                        has_fired = fired.any(axis=1)
+                        first_fired = fired.argmax(axis=1)
+                        last_fired = fired.shape[1] - 1 - fired[:, ::-1].argmax(axis=1)
+                        final = met[:, -1]
+                        
+                        for row in np.flatnonzero(has_fired | (final != states[start:end])):
+                            alert_id, user_id, alert = entries[start + row]
+                            alert['triggered'] = bool(final[row])
+                            changes.append((alert_id, user_id, alert))
+                            if not has_fired[row]:
+                                continue
+                            
+                            alert['last_triggered'] = float(timestamps[last_fired[row]])
+                            i = first_fired[row]
+                            reference = references[alert_type][i]
+                            triggered_alerts.append({
+                                'user_id': user_id,
+                                'chat_id': alert['chat_id'],
+                                'alert': alert,
+                                'current_price': float(prices[i]),
+                                'previous_price': None if np.isnan(reference) else float(reference),
+                                'timestamp': float(timestamps[i])
+                            })
+                
+                self.pending = {}
+                self.last_price = float(prices[-1])
+                self.last_changes = {
+                    alert_type: None if np.isnan(series[alert_type][-1]) else float(series[alert_type][-1])
+                    for alert_type in CHANGE_ALERT_TYPES
+                }
+            
+            self._store_changes(changes, triggered_alerts)
+        triggered_alerts.sort(key=lambda alert_data: alert_data['timestamp'])
+        return triggered_alerts
+    
+    def _check_alerts_sequential(self, ticks, previous_price):
+        """Batch fallback without NumPy: run check_alerts per tick, keeping each alert's first crossing."""
+        triggered_alerts = {}
+        for timestamp, price in ticks:
+            for alert_data in self.check_alerts(price, previous_price, timestamp):
+                alert_id = alert_data['alert']['id']
+                if alert_id not in triggered_alerts:
+                    alert_data['timestamp'] = timestamp
+                    triggered_alerts[alert_id] = alert_data
+            previous_price = price
+        return list(triggered_alerts.values())
+    
+    def _store_changes(self, changes, triggered_alerts):
+        """
+        Persist triggered-state changes from a check.
+        
+        Args:
+            changes (list): List of (alert_id, user_id, alert) tuples whose state changed
+            triggered_alerts (list): Alerts that fired during the check
+        """
+        if self.db:
+            if changes:
+                self.db.update_states([(alert_id, alert) for alert_id, _, alert in changes])
+        elif self.journal:
+            if changes:
+                self._persist([{
+                    'op': 'update',
+                    'user_id': user_id,
+                    'alert_id': alert_id,
+                    'triggered': alert['triggered'],
+                    'last_triggered': alert['last_triggered']
+                } for alert_id, user_id, alert in changes])
+        elif triggered_alerts:
             self._save_alerts()
+    
+    def _candidate_alerts(self, current_price, levels):
+        """
+        Collect the alerts whose condition may have changed since the last check.
         
-        return triggered_alerts
+        Every indexed alert's triggered flag matches the price seen by the last
+        check, so only thresholds crossed between that price and the current one
+        (plus alerts added since) need to be evaluated. The first check after
+        startup evaluates everything.
+        
+        Args:
+            current_price (float): Current price of the token
+            levels (dict): Alert type -> absolute percent change, or None if unknown
+        
+        Returns:
+            dict: Dictionary of alert ID -> (user_id, alert)
+        """
+        if self.last_price is None:
+            if self.db:
+                return dict(self.db.mismatched(current_price, levels))
+            return {
+                alert_id: (user_id, alert)
+                for user_id, user_alerts in self.alerts.items()
+                for alert_id, alert in user_alerts.items()
+            }
+        
+        candidates = dict(self.pending)
+        low, high = sorted((self.last_price, current_price))
+        if low != high:
+            # price_above is met when price >= threshold: thresholds in (low, high] flipped
+            candidates.update(self._between('price_above', low, high))
+            # price_below is met when price <= threshold: thresholds in [low, high) flipped
+            candidates.update(self._between('price_below', low, high, include_low=True, include_high=False))
+        
+        # Change alerts are met when |change| >= threshold; no change known means none are met
+        for alert_type in CHANGE_ALERT_TYPES:
+            previous, current = self.last_changes.get(alert_type), levels.get(alert_type)
+            if previous == current:
+                continue
+            if previous is None or current is None:
+                low, high = None, current if previous is None else previous
+            else:
+                low, high = sorted((previous, current))
+            candidates.update(self._between(alert_type, low, high))
+        
+        return candidates
+    
+    def _batch_candidate_alerts(self, prices, levels):
+        """
+        Collect the alerts whose condition may change anywhere within a batch of ticks.
+        
+        An alert whose threshold lies outside the range of prices (and of percent
+        changes) spanned by the batch and the last check keeps the same condition
+        throughout, so it only needs evaluating if it was never synced.
+        
+        Args:
+            prices (list): Prices of the ticks
+            levels (dict): Alert type -> absolute percent change per tick, None where unknown
+        
+        Returns:
+            dict: Dictionary of alert ID -> (user_id, alert)
+        """
+        if self.last_price is None:
+            candidates = self._candidate_alerts(prices[0], {
+                alert_type: changes[0] for alert_type, changes in levels.items()
+            })
+        else:
+            candidates = dict(self.pending)
+            prices = prices + [self.last_price]
+            levels = {
+                alert_type: changes + [self.last_changes.get(alert_type)]
+                for alert_type, changes in levels.items()
+            }
+        
+        low, high = min(prices), max(prices)
+        candidates.update(self._between('price_above', low, high, include_low=True))
+        candidates.update(self._between('price_below', low, high, include_low=True))
+        
+        for alert_type, changes in levels.items():
+            known_changes = [change for change in changes if change is not None]
+            if known_changes:
+                candidates.update(self._between(alert_type, None, max(known_changes)))
+        
+        return candidates
+    
+    def _between(self, alert_type, low, high, include_low=False, include_high=True):
+        """Look up alerts by threshold range in the database or the in-memory index."""
+        if self.db:
+            return self.db.between(alert_type, low, high, include_low, include_high)
+        return self.index[alert_type].between(low, high, include_low, include_high)
     
     def format_alert_message(self, alert_data):
         """
@@ -227,6 +739,16 @@ class AlertsManager:
                 f"Previous price: {previous_price}\n"
                 f"Current price: {current_price}"
             )
+        elif alert['type'] in WINDOWED_ALERT_TYPES:
+            _, window_description = WINDOWED_ALERT_TYPES[alert['type']]
+            percent_change = ((current_price - previous_price) / previous_price) * 100
+            direction = "increased" if percent_change > 0 else "decreased"
+            return (
+                "🚨 *NeonX Price Alert* 🚨\n\n"
+                f"Price has {direction} by {abs(percent_change):.2f}% within {window_description}!\n"
+                f"{'Low' if percent_change > 0 else 'High'} in window: {previous_price}\n"
+                f"Current price: {current_price}"
+            )
         
         return "🚨 *NeonX Price Alert* 🚨\n\nYour price alert has been triggered!"
 
@@ -250,6 +772,6 @@ if __name__ == "__main__":
     # Get user alerts
     print(alerts_manager.get_user_alerts(123456))
     
-    # Remove an alert
-    alerts_manager.remove_alert(123456, 0)
+    # Remove an alert by its ID
+    alerts_manager.remove_alert(123456, alerts_manager.get_user_alerts(123456)[0]['id'])
     print(alerts_manager.get_user_alerts(123456))
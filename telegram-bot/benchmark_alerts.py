@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Alerts Benchmark
+Measures AlertsManager at scale on synthetic alert populations and price walks
+
+Usage:
+    python benchmark_alerts.py [--sizes 10000,100000,1000000] [--storage json,journal,sqlite]
+                               [--ticks 200] [--ops 100] [--output results.json]
+                               [--baseline previous.json] [--tolerance 0.25]
+
+Each (size, storage) combination runs in its own subprocess and temporary
+directory, so memory figures are not polluted by earlier runs and real alert
+files are never touched. Results are printed as JSON; with --baseline, any
+metric that got worse by more than --tolerance is reported and the exit code
+is 1.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import resource
+import subprocess
+
+DEFAULT_SIZES = "10000,100000,1000000"
+DEFAULT_STORAGE = "json,journal,sqlite"
+ALERTS_PER_USER = 5
+
+# Metrics where a higher value is better; all others are latencies, times or memory
+HIGHER_IS_BETTER = ("add_ops_per_sec", "remove_ops_per_sec")
+
+def generate_alerts(size, alert_types, rng):
+    """
+    Generate a synthetic alert population in the alerts file format.
+    
+    Args:
+        size (int): Number of alerts
+        alert_types (tuple): Alert types to draw from
+        rng (random.Random): Random number generator
+    
+    Returns:
+        dict: Alerts keyed by user ID
+    """
+    price_types = ('price_above', 'price_below')
+    change_types = [alert_type for alert_type in alert_types if alert_type not in price_types]
+    alerts = {}
+    now = time.time()
+    
+    for i in range(size):
+        user_id = str(100000000 + rng.randrange(max(1, size // ALERTS_PER_USER)))
+        if rng.random() < 0.8:
+            alert_type = rng.choice(price_types)
+            # Thresholds spread around the starting price of 1.0
+            threshold = round(math.exp(rng.gauss(0, 0.3)), 6)
+        else:
+            alert_type = rng.choice(change_types)
+            threshold = rng.choice((1, 2, 5, 10, 20))
+        
+        alerts.setdefault(user_id, []).append({
+            'id': f"{i:016x}",
+            'type': alert_type,
+            'threshold': threshold,
+            'chat_id': int(user_id),
+            'created_at': now,
+            'triggered': False,
+            'last_triggered': None
+        })
+    
+    # Drop duplicates the manager would have rejected
+    for user_id, user_alerts in alerts.items():
+        seen = {}
+        for alert in user_alerts:
+            seen.setdefault((alert['type'], alert['threshold']), alert)
+        alerts[user_id] = list(seen.values())
+    
+    return alerts
+
+def price_walk(ticks, rng, start=1.0, volatility=0.01, interval=60):
+    """Generate (timestamp, price) ticks of a geometric random walk."""
+    price = start
+    timestamp = time.time()
+    walk = []
+    for _ in range(ticks):
+        price *= math.exp(rng.gauss(0, volatility))
+        timestamp += interval
+        walk.append((timestamp, price))
+    return walk
+
+def percentiles(samples):
+    """Return latency percentiles in milliseconds."""
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    
+    def pick(fraction):
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+    
+    return {"p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99), "max_ms": samples[-1] * 1000}
+
+def max_rss_mb():
+    """Return this process's peak resident set size in megabytes."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+def run_worker(size, storage, ticks, ops, seed):
+    """
+    Benchmark one population size and storage mode in the current directory.
+    
+    Returns:
+        dict: Measured metrics
+    """
+    # Keep the module-level singleton on plain JSON storage in the empty work directory
+    os.environ["ALERTS_STORAGE"] = "json"
+    import alerts_manager as am
+    
+    rng = random.Random(seed)
+    alerts = generate_alerts(size, am.ALERT_TYPES, rng)
+    with open(am.ALERTS_FILE, 'w') as f:
+        json.dump(alerts, f)
+    baseline_rss = max_rss_mb()
+    
+    # Load (for sqlite this includes the one-shot import from JSON)
+    started = time.perf_counter()
+    manager = am.AlertsManager(storage=storage)
+    load_seconds = time.perf_counter() - started
+    loaded_rss = max_rss_mb()
+    
+    # Price ticks; the first check after load evaluates everything, so report it separately
+    walk = price_walk(ticks + 1, rng)
+    started = time.perf_counter()
+    manager.check_alerts(walk[0][1], None, walk[0][0])
+    first_check_seconds = time.perf_counter() - started
+    
+    latencies = []
+    triggered = 0
+    previous_price = walk[0][1]
+    for timestamp, price in walk[1:]:
+        started = time.perf_counter()
+        triggered += len(manager.check_alerts(price, previous_price, timestamp))
+        latencies.append(time.perf_counter() - started)
+        previous_price = price
+    
+    # Add then remove synthetic alerts for fresh users
+    new_alerts = [
+        (f"bench{i}", rng.choice(('price_above', 'price_below')), round(rng.uniform(0.5, 2.0), 6))
+        for i in range(ops)
+    ]
+    started = time.perf_counter()
+    for user_id, alert_type, threshold in new_alerts:
+        manager.add_alert(user_id, alert_type, threshold)
+    add_seconds = time.perf_counter() - started
+    
+    alert_ids = [(user_id, manager.get_user_alerts(user_id)[0]['id']) for user_id, _, _ in new_alerts]
+    started = time.perf_counter()
+    for user_id, alert_id in alert_ids:
+        manager.remove_alert(user_id, alert_id)
+    remove_seconds = time.perf_counter() - started
+    
+    # Full save: JSON rewrite, or journal compaction; SQLite writes as it goes
+    save_seconds = None
+    if storage == "json":
+        started = time.perf_counter()
+        manager._save_alerts()
+        save_seconds = time.perf_counter() - started
+    elif storage == "journal":
+        started = time.perf_counter()
+        manager.journal.compact()
+        save_seconds = time.perf_counter() - started
+    
+    result = {
+        "size": sum(len(user_alerts) for user_alerts in alerts.values()),
+        "storage": storage,
+        "ticks": ticks,
+        "triggered": triggered,
+        "load_seconds": load_seconds,
+        "save_seconds": save_seconds,
+        "first_check_ms": first_check_seconds * 1000,
+        "add_ops_per_sec": ops / add_seconds if add_seconds else None,
+        "remove_ops_per_sec": ops / remove_seconds if remove_seconds else None,
+        "rss_mb": loaded_rss,
+        "rss_delta_mb": loaded_rss - baseline_rss
+    }
+    result.update({f"check_{name}": value for name, value in percentiles(latencies).items()})
+    return result
+
+def run_case(size, storage, args):
+    """Run one benchmark case in a subprocess and temporary directory."""
+    work_dir = tempfile.mkdtemp(prefix="neonx-bench-")
+    try:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker",
+             "--sizes", str(size), "--storage", storage,
+             "--ticks", str(args.ticks), "--ops", str(args.ops), "--seed", str(args.seed)],
+            cwd=work_dir, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            return {"size": size, "storage": storage, "error": completed.stderr.strip().splitlines()[-1:]}
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline run.
+    
+    Returns:
+        list: Descriptions of metrics that regressed by more than the tolerance
+    """
+    previous = {(entry["size"], entry["storage"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    
+    for entry in results:
+        old = previous.get((entry["size"], entry["storage"]))
+        if not old:
+            continue
+        for metric, value in entry.items():
+            old_value = old.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old_value, (int, float)) or not old_value:
+                continue
+            if metric in ("size", "ticks", "triggered"):
+                continue
+            change = (value - old_value) / old_value
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append(
+                    f"{entry['storage']} @ {entry['size']}: {metric} {old_value:.4g} -> {value:.4g} ({change:+.0%})"
+                )
+    
+    return regressions
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description="Benchmark the NeonX alerts manager")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated alert population sizes")
+    parser.add_argument("--storage", default=DEFAULT_STORAGE, help="Comma-separated storage modes")
+    parser.add_argument("--ticks", type=int, default=200, help="Price ticks replayed per case")
+    parser.add_argument("--ops", type=int, default=100, help="Alerts added and removed per case")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        print(json.dumps(run_worker(int(args.sizes), args.storage, args.ticks, args.ops, args.seed)))
+        return 0
+    
+    results = []
+    for size in (int(size) for size in args.sizes.split(",")):
+        for storage in args.storage.split(","):
+            print(f"Benchmarking {storage} storage with {size} alerts...", file=sys.stderr)
+            result = run_case(size, storage, args)
+            print(f"  {result}", file=sys.stderr)
+            results.append(result)
+    
+    report = {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "ticks": args.ticks,
+        "ops": args.ops,
+        "seed": args.seed,
+        "results": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Extractor Benchmark
+Compares the single-pass extract_all with the per-field extractors on saved pages
+
+Usage:
+    python benchmark_extractors.py [--page saved.html ...] [--repeat 20] [--output results.json]
+
+Each page (by default the sample pages built by sample_pages.py) is parsed
+once, then both ways of extracting the price fields are timed on the same tree
+and checked to give the same fields.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from bs4 import BeautifulSoup
+
+from page_parser import extract_all
+from sample_pages import SAMPLE_PAGES, sample_page
+from price_tracker import (
+    extract_price, extract_market_cap, extract_holders, extract_volume, extract_price_change
+)
+
+def extract_separately(soup):
+    """Extract the price fields with one extractor, and one tree walk, per field."""
+    return {
+        "price": extract_price(soup),
+        "market_cap": extract_market_cap(soup),
+        "holders": extract_holders(soup),
+        "volume_24h": extract_volume(soup),
+        "price_change_24h": extract_price_change(soup)
+    }
+
+def timed(func, soup, repeat):
+    """
+    Time func(soup), averaged over repeat calls.
+    
+    Returns:
+        tuple: (result, milliseconds per call)
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(soup)
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+def load_pages(paths):
+    """
+    Read saved pages, or build the sample pages if none are given.
+    
+    Returns:
+        list: (page name, HTML) tuples
+    """
+    if not paths:
+        return [(name, sample_page(name)) for name in SAMPLE_PAGES]
+    pages = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+def benchmark_page(name, html, repeat):
+    """
+    Benchmark both extractors on one page.
+    
+    Returns:
+        dict: Measured metrics
+    """
+    started = time.perf_counter()
+    soup = BeautifulSoup(html, 'html.parser')
+    parse_ms = (time.perf_counter() - started) * 1000
+    
+    separate, separate_ms = timed(extract_separately, soup, repeat)
+    single, single_ms = timed(extract_all, soup, repeat)
+    if separate != single:
+        raise ValueError(f"Extractors disagree on {name}: {separate} != {single}")
+    
+    return {
+        "page": name,
+        "bytes": len(html.encode('utf-8')),
+        "parse_ms": parse_ms,
+        "separate_extract_ms": separate_ms,
+        "single_pass_extract_ms": single_ms,
+        "speedup": separate_ms / single_ms,
+        "fields": single
+    }
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the NeonX price extractors")
+    parser.add_argument("--page", action="append", help="Saved coin page to benchmark (repeatable)")
+    parser.add_argument("--repeat", type=int, default=20, help="Extractions timed per page")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    
+    results = []
+    for name, html in load_pages(args.page):
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        results.append(benchmark_page(name, html, args.repeat))
+    
+    output = json.dumps({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
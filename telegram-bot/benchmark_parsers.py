@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Parser Benchmark
+Compares the HTML parser backends on a corpus of saved coin pages
+
+Usage:
+    python benchmark_parsers.py [--page saved.html ...] [--backend lxml ...] [--repeat 10] [--output results.json]
+
+Each backend (by default every one installed) is run on each page (by default
+the sample pages built by sample_pages.py) in a fresh interpreter, so its peak
+memory is measured on its own: peak RSS growth covers the native parsers'
+allocations, and tracemalloc's peak the Python objects. Parse time is the mean over repeat
+parses. Every backend is checked to extract the same fields as html.parser.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tracemalloc
+import subprocess
+
+from page_parser import available_backends, parse_fields
+from sample_pages import SAMPLE_PAGES, sample_page
+
+def reset_peak_rss():
+    """Reset the peak RSS to the current RSS where Linux allows it, so the next peak is the parse's own."""
+    try:
+        with open("/proc/self/clear_refs", 'w') as f:
+            f.write("5")
+    except OSError:
+        pass  # The peak then includes the imports, which can hide a small parse
+
+def peak_rss_bytes():
+    """Return this process's peak resident set size in bytes."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kilobytes
+
+def read_page(page):
+    """
+    Read a saved page, or build a sample page.
+    
+    Args:
+        page (str): Path of a saved page, or one of the sample page names
+    
+    Returns:
+        str: Page HTML
+    """
+    if page in SAMPLE_PAGES:
+        return sample_page(page)
+    with open(page, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def measure(page, backend, repeat):
+    """
+    Measure one backend on one page in this process.
+    
+    Returns:
+        dict: Measured metrics
+    """
+    html = read_page(page)
+    
+    reset_peak_rss()
+    baseline_rss = peak_rss_bytes()
+    tracemalloc.start()
+    fields = parse_fields(html, backend)
+    python_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_growth = peak_rss_bytes() - baseline_rss
+    
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse_fields(html, backend)
+    parse_ms = (time.perf_counter() - started) / repeat * 1000
+    
+    return {
+        "page": os.path.basename(page),
+        "backend": backend,
+        "bytes": len(html.encode('utf-8')),
+        "parse_ms": parse_ms,
+        "peak_rss_growth_kb": rss_growth // 1024,
+        "peak_python_kb": python_peak // 1024,
+        "fields": fields
+    }
+
+def run_worker(page, backend, repeat):
+    """
+    Measure one backend on one page in a fresh interpreter.
+    
+    Returns:
+        dict: Measured metrics
+    """
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", "--page", page, "--backend", backend, "--repeat", str(repeat)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the NeonX HTML parser backends")
+    parser.add_argument("--page", action="append", help="Saved coin page to benchmark (repeatable)")
+    parser.add_argument("--backend", action="append", help="Backend to benchmark (repeatable). Defaults to all installed.")
+    parser.add_argument("--repeat", type=int, default=10, help="Parses timed per page and backend")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        print(json.dumps(measure(args.page[0], args.backend[0], args.repeat)))
+        return 0
+    
+    pages = args.page or list(SAMPLE_PAGES)
+    backends = args.backend or available_backends()
+    results = []
+    problems = []
+    for page in pages:
+        print(f"Benchmarking {page}...", file=sys.stderr)
+        expected = parse_fields(read_page(page), "html.parser")
+        for backend in backends:
+            result = run_worker(page, backend, args.repeat)
+            if result["fields"] != expected:
+                problems.append(f"{backend} disagrees with html.parser on {page}: {result['fields']} != {expected}")
+            results.append(result)
+    
+    output = json.dumps({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    
+    print(f"{'page':<32} {'backend':<12} {'parse ms':>10} {'peak RSS KB':>12} {'peak Python KB':>15}", file=sys.stderr)
+    for result in results:
+        print(
+            f"{result['page']:<32} {result['backend']:<12} {result['parse_ms']:>10.2f} "
+            f"{result['peak_rss_growth_kb']:>12} {result['peak_python_kb']:>15}",
+            file=sys.stderr
+        )
+    for problem in problems:
+        print(f"PROBLEM: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
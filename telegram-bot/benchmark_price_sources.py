@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Price Source Benchmark
+Compares bytes and parse time per poll of the HTML and JSON price sources
+
+Usage:
+    python benchmark_price_sources.py [--polls 50] [--output results.json]
+
+The sources poll the stub server, which serves the recorded fixtures, so no
+network access is needed. The HTML source runs three times: reading the whole
+page, streaming it until every field is found and then reading out the rest
+so the connection is reused, and streaming without reading out the rest,
+which drops the connection. These runs send no validators,
+so every poll downloads and parses. Each source then runs again with
+conditional requests, where the unchanged fixtures come back as 304 Not
+Modified. Results are printed as JSON, with the savings of streaming and of
+the JSON source as ratios, and the shared session's connection reuse and
+bytes saved. The exit code is 1 if streaming with read-out fails to reuse its
+connection.
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from price_stub_server import start_stub_server
+from price_sources import HTMLPriceSource, JSONPriceSource
+from price_tracker import extract_fields
+from page_parser import StreamingFieldParser
+
+SAMPLE_ADDRESS = "NeonXm1nt5ampLeAddre55pump000000000000000000"
+
+def mode(source):
+    """Describe how a source reads responses."""
+    if not getattr(source, "stream_parser", None):
+        return "full"
+    return "stream" if source.drain_bytes else "stream, no drain"
+
+def run(source, polls):
+    """
+    Poll a source repeatedly.
+    
+    Returns:
+        dict: Per-poll metrics and the fields of the last poll
+    """
+    started = time.perf_counter()
+    for _ in range(polls):
+        fields = source.fetch()
+    seconds = time.perf_counter() - started
+    return {
+        "source": source.name,
+        "mode": mode(source),
+        "bytes_per_poll": source.stats["bytes"] / polls,
+        "wire_bytes_per_poll": source.stats["wire_bytes"] / polls,
+        "parse_ms_per_poll": source.stats["parse_seconds"] / polls * 1000,
+        "total_ms_per_poll": seconds / polls * 1000,
+        "not_modified": source.stats["not_modified"],
+        "connections_opened": source.stats["connections_opened"],
+        "connections_reused": source.stats["connections_reused"],
+        "bytes_saved_compression": source.stats["bytes_saved_compression"],
+        "bytes_saved_not_modified": source.stats["bytes_saved_not_modified"],
+        "fields": fields
+    }
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the NeonX price sources")
+    parser.add_argument("--polls", type=int, default=50, help="Polls per source")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    
+    server, base_url = start_stub_server()
+    try:
+        page_url = f"{base_url}/coin/{SAMPLE_ADDRESS}"
+        api_url = f"{base_url}/latest/dex/tokens/{SAMPLE_ADDRESS}"
+        html = run(HTMLPriceSource(page_url, extract_fields, conditional=False), args.polls)
+        streamed = run(HTMLPriceSource(page_url, extract_fields, StreamingFieldParser, conditional=False), args.polls)
+        undrained = run(
+            HTMLPriceSource(page_url, extract_fields, StreamingFieldParser, drain_bytes=0, conditional=False), args.polls
+        )
+        api = run(JSONPriceSource(api_url, conditional=False), args.polls)
+        conditional = [
+            run(HTMLPriceSource(page_url, extract_fields), args.polls),
+            run(HTMLPriceSource(page_url, extract_fields, StreamingFieldParser), args.polls),
+            run(JSONPriceSource(api_url), args.polls)
+        ]
+    finally:
+        server.shutdown()
+    
+    report = {
+        "python": sys.version.split()[0],
+        "polls": args.polls,
+        "results": [html, streamed, undrained, api],
+        "conditional_results": conditional,
+        "stream_bytes_ratio": html["bytes_per_poll"] / streamed["bytes_per_poll"],
+        "stream_total_ratio": html["total_ms_per_poll"] / streamed["total_ms_per_poll"],
+        "bytes_ratio": html["bytes_per_poll"] / api["bytes_per_poll"],
+        "parse_ratio": html["parse_ms_per_poll"] / api["parse_ms_per_poll"]
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    
+    # Only the first poll of a run may need a new connection
+    problems = [
+        f"{result['source']} ({result['mode']}) opened {result['connections_opened']} connections in {args.polls} polls"
+        for result in [html, streamed, api] + conditional
+        if result["connections_opened"] > 1
+    ]
+    for problem in problems:
+        print(f"PROBLEM: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
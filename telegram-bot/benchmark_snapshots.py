@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Snapshot Benchmark
+Compares JSON and binary snapshot load/save times on real-sized data files
+
+Usage:
+    python benchmark_snapshots.py [--users 200000] [--alerts 1000000] [--file community_data.json ...]
+                                  [--output results.json]
+
+Without --file, a synthetic community file and alerts file of the given sizes
+are generated. Each file is saved and loaded as pretty-printed JSON and as a
+snapshot with every available serializer and compression, in a temporary
+directory.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+import snapshot
+from benchmark_alerts import generate_alerts
+from benchmark_users import generate_users
+from alerts_manager import ALERT_TYPES
+
+def synthetic_files(users, alerts, rng):
+    """
+    Generate synthetic data in the community and alerts file formats.
+    
+    Returns:
+        dict: Data keyed by file name
+    """
+    community = {
+        "users": generate_users(users, rng),
+        "memes": [
+            {
+                "file_id": f"file{i}",
+                "user_id": str(rng.randrange(10 ** 8, 8 * 10 ** 9)),
+                "caption": None,
+                "submitted_at": time.time(),
+                "likes": 0,
+                "liked_by": ""
+            }
+            for i in range(users // 100)
+        ],
+        "stats": {"total_users": users, "active_users": 0, "total_messages": 0, "last_updated": 0}
+    }
+    return {
+        "community_data.json": community,
+        "user_alerts.json": generate_alerts(alerts, ALERT_TYPES, rng)
+    }
+
+def timed(func):
+    """Return (result, seconds) of calling func."""
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+def benchmark_file(name, data, work_dir):
+    """
+    Benchmark saving and loading one data file in every format.
+    
+    Returns:
+        list: One result per format
+    """
+    json_file = os.path.join(work_dir, name)
+    formats = [("json", None, None)] + [
+        ("binary", serializer, compression)
+        for serializer in snapshot.SERIALIZERS if serializer != "msgpack" or snapshot.msgpack is not None
+        for compression in snapshot.COMPRESSIONS if compression != "zstd" or snapshot.zstandard is not None
+    ]
+    results = []
+    
+    for file_format, serializer, compression in formats:
+        snapshot.SNAPSHOT_FORMAT = file_format
+        snapshot.SNAPSHOT_SERIALIZER = serializer or "pickle"
+        snapshot.SNAPSHOT_COMPRESSION = compression or "none"
+        path = snapshot.snapshot_file(json_file) if file_format == "binary" else json_file
+        
+        _, save_seconds = timed(lambda: snapshot.save_snapshot(json_file, data))
+        loaded, load_seconds = timed(lambda: snapshot.load_snapshot(json_file))
+        if loaded != data:
+            raise ValueError(f"{name} did not survive a {file_format} round trip")
+        
+        results.append({
+            "file": name,
+            "format": file_format,
+            "serializer": serializer or "json",
+            "compression": compression or "none",
+            "bytes": os.path.getsize(path),
+            "save_seconds": save_seconds,
+            "load_seconds": load_seconds
+        })
+        os.remove(path)
+    
+    baseline = results[0]
+    for result in results:
+        result["save_speedup"] = baseline["save_seconds"] / result["save_seconds"]
+        result["load_speedup"] = baseline["load_seconds"] / result["load_seconds"]
+    return results
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark NeonX data file formats")
+    parser.add_argument("--users", type=int, default=200000, help="Synthetic community users")
+    parser.add_argument("--alerts", type=int, default=1000000, help="Synthetic alerts")
+    parser.add_argument("--file", action="append", help="Existing JSON data file to benchmark instead")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    
+    if args.file:
+        files = {}
+        for path in args.file:
+            with open(path, 'r') as f:
+                files[os.path.basename(path)] = json.load(f)
+    else:
+        files = synthetic_files(args.users, args.alerts, random.Random(args.seed))
+    
+    work_dir = tempfile.mkdtemp(prefix="neonx-snapshots-")
+    try:
+        results = []
+        for name, data in files.items():
+            print(f"Benchmarking {name}...", file=sys.stderr)
+            results.extend(benchmark_file(name, data, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    output = json.dumps({"python": sys.version.split()[0], "results": results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
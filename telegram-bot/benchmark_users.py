@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX User Store Benchmark
+Compares the memory of the compact user store with plain per-user dicts
+
+Usage:
+    python benchmark_users.py [--users 100000,500000] [--output results.json]
+
+Synthetic users are written in the community data file format and loaded both
+as the dict of dicts json produces and as a UserStore. Retained memory is
+measured with tracemalloc and printed as JSON.
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+FIRST_NAMES = ["Alex", "Sam", "Maria", "Chen", "Olga", "Juan", "Aisha", "Lee", "Noah", "Emma"]
+
+def generate_users(count, rng):
+    """
+    Generate synthetic users in the community data file format.
+    
+    Args:
+        count (int): Number of users
+        rng (random.Random): Random number generator
+    
+    Returns:
+        dict: User dicts keyed by user ID string
+    """
+    now = time.time()
+    users = {}
+    for _ in range(count):
+        user_id = str(rng.randrange(10 ** 8, 8 * 10 ** 9))
+        first_seen = now - rng.uniform(0, 365 * 86400)
+        users[user_id] = {
+            "username": f"user{user_id}" if rng.random() < 0.7 else None,
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": None,
+            "first_seen": first_seen,
+            "last_active": rng.uniform(first_seen, now),
+            "message_count": rng.randrange(1, 500)
+        }
+    return users
+
+def measure(build):
+    """
+    Measure the memory retained by the result of build().
+    
+    Returns:
+        tuple: (result, retained bytes, seconds taken)
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, retained, seconds
+
+def run(count, seed):
+    """
+    Benchmark one population size.
+    
+    Returns:
+        dict: Measured metrics
+    """
+    from user_store import UserStore
+    
+    text = json.dumps(generate_users(count, random.Random(seed)))
+    count = len(json.loads(text))
+    
+    users, dict_bytes, dict_seconds = measure(lambda: json.loads(text))
+    del users
+    
+    def build_store():
+        return UserStore.from_json(json.loads(text))
+    
+    store, store_bytes, store_seconds = measure(build_store)
+    del store
+    
+    return {
+        "users": count,
+        "dict_bytes_per_user": dict_bytes / count,
+        "store_bytes_per_user": store_bytes / count,
+        "memory_ratio": dict_bytes / store_bytes,
+        "dict_load_seconds": dict_seconds,
+        "store_load_seconds": store_seconds
+    }
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the NeonX user store")
+    parser.add_argument("--users", default="100000,500000", help="Comma-separated user counts")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    
+    results = []
+    for count in (int(count) for count in args.users.split(",")):
+        print(f"Benchmarking {count} users...", file=sys.stderr)
+        results.append(run(count, args.seed))
+    
+    output = json.dumps({"python": sys.version.split()[0], "results": results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Extractor Check
+Checks that every way of extracting the price fields gives the same fields
+
+Usage:
+    python check_extractors.py [--pages 2000] [--seed 1]
+
+Random pages mix nested elements, price divs and look-alikes, labels in text
+and comments, void elements and character references. For each page, the
+per-field extractors in price_tracker give the expected fields. extract_all
+must match them, and so must every installed parser backend, plus the
+streaming parser fed in random small chunks as it is during a streamed
+download. The small sample page and the full-size sample pages are checked
+the same way. Pages are well-formed, since selectolax and lxml may repair
+badly nested markup differently from html.parser. No string is whitespace
+only, since BeautifulSoup shortens those to a newline or a space and the
+other parsers keep them as they are.
+
+Prints each mismatch and exits with 1 if there are any.
+"""
+
+import sys
+import random
+import argparse
+
+from bs4 import BeautifulSoup
+
+from page_parser import StreamingFieldParser, available_backends, extract_all, parse_fields
+from sample_pages import SAMPLE_FIXTURE, SAMPLE_PAGES, sample_page
+from benchmark_extractors import extract_separately
+
+ELEMENTS = ("div", "span", "section", "b", "em", "strong")
+CLASSES = ("", "stat", "price", "token-price text-green-300", "prices-chart", "label")
+WORDS = (
+    "Market Cap:", "market cap", "Holders:", "holders", "Volume (24h):", "volume", "Change (24h):", "change",
+    "Price", "$42,170", "1,284", "+12.6%", "0.00004217", "gm", "neon", "AT&amp;T", "&lt;3", "caf&eacute;", "\n  "
+)
+
+def random_text(rng):
+    """Return one to three words, at least one of them not whitespace."""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(0, 2))] + [rng.choice([word for word in WORDS if word.strip()])]
+    rng.shuffle(words)
+    return " ".join(words)
+
+def random_nodes(rng, depth):
+    """
+    Build the markup of a random run of sibling nodes.
+    
+    Returns:
+        str: HTML fragment
+    """
+    parts = []
+    for _ in range(rng.randint(0, 4)):
+        kind = rng.random()
+        if kind < 0.35:
+            parts.append(random_text(rng))
+        elif kind < 0.45:
+            parts.append(f"<!-- {random_text(rng)} -->")
+        elif kind < 0.5:
+            parts.append(rng.choice(("<br>", '<img src="logo.png" alt="NeonX">', "<hr/>")))
+        elif depth < 4:
+            tag = rng.choice(ELEMENTS)
+            classes = rng.choice(CLASSES)
+            attributes = f' class="{classes}"' if classes else ""
+            parts.append(f"<{tag}{attributes}>{random_nodes(rng, depth + 1)}</{tag}>")
+    return "".join(parts)
+
+def random_page(rng):
+    """Build a random well-formed page."""
+    return f"<!DOCTYPE html><html><head><title>NeonX</title></head><body>{random_nodes(rng, 0)}</body></html>"
+
+def stream_in_chunks(html, rng):
+    """Extract the fields with the streaming parser, fed in random small chunks."""
+    parser = StreamingFieldParser()
+    start = 0
+    while start < len(html) and not parser.finished:
+        end = start + rng.randint(1, 64)
+        parser.feed(html[start:end])
+        start = end
+    if not parser.finished:
+        parser.close()
+    return parser.result()
+
+def check_page(name, html, backends, rng):
+    """
+    Check every extractor on one page against the per-field extractors.
+    
+    Returns:
+        list: Descriptions of the mismatches
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    expected = extract_separately(soup)
+    results = {"extract_all": extract_all(soup), "stream in chunks": stream_in_chunks(html, rng)}
+    for backend in backends:
+        results[backend] = parse_fields(html, backend)
+    return [
+        f"{extractor} on {name}: {fields} != {expected}"
+        for extractor, fields in results.items() if fields != expected
+    ]
+
+def main():
+    """Run the check."""
+    parser = argparse.ArgumentParser(description="Check the NeonX price extractors against each other")
+    parser.add_argument("--pages", type=int, default=2000, help="Random pages to check")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the random pages")
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    backends = available_backends()
+    with open(SAMPLE_FIXTURE, 'r', encoding='utf-8') as f:
+        pages = [("pump_fun_coin", f.read())]
+    pages += [(name, sample_page(name)) for name in SAMPLE_PAGES]
+    pages += [(f"random page {index}", random_page(rng)) for index in range(args.pages)]
+    
+    problems = []
+    for name, html in pages:
+        problems += check_page(name, html, backends, rng)
+    
+    for problem in problems:
+        print(f"PROBLEM: {problem}")
+    print(f"Checked {len(pages)} pages with extract_all, chunked streaming and {', '.join(backends)}: {len(problems)} mismatches")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
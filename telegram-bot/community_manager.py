@@ -7,11 +7,21 @@ Manages community features like meme sharing and statistics
 """
 
 import os
-import json
 import time
 import logging
+import base64
+import bisect
 import random
+import atexit
+import threading
+from array import array
+from collections import OrderedDict, deque
 from dotenv import load_dotenv
+from hyperloglog import HyperLogLog
+from snapshot import load_snapshot, serialize_snapshot, snapshot_file, write_snapshot
+from user_store import UserStore, ShardedUserStore
+from striped_lock import StripedLock
+from event_log import event_log
 
 # Load environment variables
 load_dotenv()
@@ -24,25 +34,474 @@ logger = logging.getLogger(__name__)
 
 # Constants
 COMMUNITY_DATA_FILE = "community_data.json"
+COMMUNITY_STORAGE = os.getenv("COMMUNITY_STORAGE", "file")  # 'file' or 'sharded'
+COMMUNITY_DATA_DIRECTORY = "community_data"  # Sharded layout: meta, memes and user shard files
 MEMES_DIRECTORY = "memes"
+ACTIVE_USER_WINDOW = 86400  # 24 hours in seconds
+# Write-behind: changes are flushed at most this many seconds later (0 saves on every change)
+COMMUNITY_FLUSH_INTERVAL = float(os.getenv("COMMUNITY_FLUSH_INTERVAL", "5"))
+COMMUNITY_FLUSH_MUTATIONS = int(os.getenv("COMMUNITY_FLUSH_MUTATIONS", "100"))  # or after this many changes
+MEME_HISTORY_SIZE = int(os.getenv("MEME_HISTORY_SIZE", "10"))  # Recent memes not repeated in a chat
+MEME_HISTORY_CHATS = 10000  # Chats whose meme history is remembered
+MEME_SAMPLE_ATTEMPTS = 8  # Draws before excluding recent memes exactly
+CHAT_HOURLY_BUCKETS = 48  # Hours of per-chat message counts kept
+CHAT_DAILY_BUCKETS = 30  # Days of per-chat message counts and unique-user sketches kept
+# Rendered stats messages are reused until the data changes, or for this many seconds regardless
+COMMUNITY_STATS_CACHE_TTL = float(os.getenv("COMMUNITY_STATS_CACHE_TTL", "5"))
+STATS_CACHE_CHATS = 1000  # Chats whose rendered stats message is kept
+CHAT_LOCK_STRIPES = 64  # Per-chat locks shared out by chat ID
 
-class CommunityManager:
-    """Manages community features."""
+class ActiveUserWindow:
+    """
+    Users active within a sliding time window.
+    
+    Users are kept in order of their last activity, so recording activity moves
+    one user to the end and expiry only pops from the front: amortized O(1) per
+    event instead of a rescan of every user.
+    """
+    
+    def __init__(self, window=ACTIVE_USER_WINDOW):
+        """
+        Initialize the window.
+        
+        Args:
+            window (int): Window length in seconds
+        """
+        self.window = window
+        self.last_active = OrderedDict()
+    
+    def __len__(self):
+        """Return the number of active users."""
+        return len(self.last_active)
+    
+    def load(self, activity, current_time):
+        """
+        Fill the window from stored user activity.
+        
+        Args:
+            activity (iterable): (user ID, last active time) pairs
+            current_time (float): Current time in seconds
+        """
+        recent = [
+            (last_active, user_id) for user_id, last_active in activity
+            if current_time - last_active < self.window
+        ]
+        self.last_active = OrderedDict((user_id, last_active) for last_active, user_id in sorted(recent))
+    
+    def touch(self, user_id, current_time):
+        """
+        Record activity for a user and drop users who fell out of the window.
+        
+        Args:
+            user_id (str): User ID
+            current_time (float): Time of the activity in seconds
+        """
+        self.last_active[user_id] = current_time
+        self.last_active.move_to_end(user_id)
+        self.expire(current_time)
+    
+    def expire(self, current_time):
+        """Drop users whose last activity is outside the window."""
+        while self.last_active:
+            user_id, last_active = next(iter(self.last_active.items()))
+            if current_time - last_active < self.window:
+                break
+            del self.last_active[user_id]
+
+class LikeSet:
+    """
+    Compact set of the user IDs that liked a meme.
+    
+    IDs are kept as a sorted array of 64-bit integers, about 8 bytes each
+    instead of a Python string per like, with O(log n) membership checks. In the
+    data file the set is stored as base64 of the zigzag varint-encoded gaps
+    between consecutive IDs. Changes replace the array instead of editing it,
+    so copies are O(1) and unaffected by later likes.
+    """
+    
+    def __init__(self, user_ids=()):
+        """
+        Initialize the set.
+        
+        Args:
+            user_ids (iterable): User IDs as ints or numeric strings
+        """
+        self.ids = array('q', sorted({int(user_id) for user_id in user_ids}))
+    
+    def __len__(self):
+        """Return the number of likes."""
+        return len(self.ids)
+    
+    def __iter__(self):
+        """Iterate over the user IDs in ascending order."""
+        return iter(self.ids)
+    
+    def __contains__(self, user_id):
+        """Check whether a user liked the meme."""
+        user_id = int(user_id)
+        position = bisect.bisect_left(self.ids, user_id)
+        return position < len(self.ids) and self.ids[position] == user_id
+    
+    def add(self, user_id):
+        """
+        Add a user.
+        
+        Returns:
+            bool: True if the user was added, False if already present
+        """
+        user_id = int(user_id)
+        position = bisect.bisect_left(self.ids, user_id)
+        if position < len(self.ids) and self.ids[position] == user_id:
+            return False
+        self.ids = self.ids[:position] + array('q', (user_id,)) + self.ids[position:]
+        return True
+    
+    def discard(self, user_id):
+        """
+        Remove a user.
+        
+        Returns:
+            bool: True if the user was removed, False if not present
+        """
+        user_id = int(user_id)
+        position = bisect.bisect_left(self.ids, user_id)
+        if position == len(self.ids) or self.ids[position] != user_id:
+            return False
+        self.ids = self.ids[:position] + self.ids[position + 1:]
+        return True
+    
+    def copy(self):
+        """Return a copy that shares the current ID array."""
+        copied = LikeSet()
+        copied.ids = self.ids
+        return copied
+    
+    def encode(self):
+        """
+        Encode the set for the data file.
+        
+        Returns:
+            str: Base64 of the varint-encoded ID gaps
+        """
+        encoded = bytearray()
+        previous = 0
+        for user_id in self.ids:
+            gap = user_id - previous
+            previous = user_id
+            # Zigzag so a negative first ID still encodes as a small unsigned value
+            value = gap * 2 if gap >= 0 else -gap * 2 - 1
+            while value >= 0x80:
+                encoded.append((value & 0x7f) | 0x80)
+                value >>= 7
+            encoded.append(value)
+        return base64.b64encode(bytes(encoded)).decode('ascii')
+    
+    @classmethod
+    def decode(cls, text):
+        """
+        Decode a set written by encode().
+        
+        Args:
+            text (str): Encoded set
+        
+        Returns:
+            LikeSet: The decoded set
+        """
+        like_set = cls()
+        previous = 0
+        value = 0
+        shift = 0
+        for byte in base64.b64decode(text):
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if byte & 0x80:
+                continue
+            previous += value >> 1 if not value & 1 else -((value + 1) >> 1)
+            like_set.ids.append(previous)
+            value = 0
+            shift = 0
+        return like_set
+    
+    @classmethod
+    def from_json(cls, value):
+        """
+        Load a set from the data file, accepting the legacy list of user IDs.
+        
+        Args:
+            value (str or list): Encoded set or list of user IDs
+        
+        Returns:
+            LikeSet: The loaded set
+        """
+        if isinstance(value, str):
+            return cls.decode(value)
+        return cls(value)
+
+def _encode_json(value):
+    """Serialize values json does not handle natively."""
+    if isinstance(value, LikeSet):
+        return value.encode()
+    if isinstance(value, HyperLogLog):
+        return value.to_json()
+    if isinstance(value, UserStore):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class MemeLeaderboard:
+    """
+    Meme indices ranked by likes, updated in O(1) per like.
+    
+    Memes with the same number of likes form a contiguous group in the ranking.
+    A like swaps the meme with the first member of its group, which moves it to
+    the end of the next group up, so no re-sort is needed. Within a group, memes
+    that reached the count first rank first.
+    """
     
     def __init__(self):
-        """Initialize the community manager."""
-        self.data = self._load_data()
+        """Initialize an empty leaderboard."""
+        self.ranked = []  # Meme indices, most liked first
+        self.position = []  # Meme index -> position in ranked
+        self.likes = []  # Meme index -> likes
+        self.group_start = {}  # Likes -> first position of the group
+        self.group_size = {}  # Likes -> number of memes in the group
+    
+    def load(self, memes):
+        """
+        Build the leaderboard from a list of memes.
+        
+        Args:
+            memes (list): Memes in index order
+        """
+        self.likes = [meme["likes"] for meme in memes]
+        self.ranked = sorted(range(len(memes)), key=lambda index: -self.likes[index])
+        self.position = [0] * len(memes)
+        self.group_start = {}
+        self.group_size = {}
+        for position, index in enumerate(self.ranked):
+            self.position[index] = position
+            self.group_start.setdefault(self.likes[index], position)
+            self.group_size[self.likes[index]] = self.group_size.get(self.likes[index], 0) + 1
+    
+    def _swap(self, a, b):
+        """Swap the memes at two positions."""
+        ranked = self.ranked
+        ranked[a], ranked[b] = ranked[b], ranked[a]
+        self.position[ranked[a]] = a
+        self.position[ranked[b]] = b
+    
+    def _leave_group(self, likes):
+        """Shrink a group by one, dropping it when empty."""
+        self.group_size[likes] -= 1
+        if not self.group_size[likes]:
+            del self.group_size[likes]
+            del self.group_start[likes]
+    
+    def add(self):
+        """
+        Add a new meme with no likes.
+        
+        Returns:
+            int: Index of the new meme
+        """
+        index = len(self.likes)
+        self.likes.append(0)
+        self.position.append(len(self.ranked))
+        self.ranked.append(index)
+        # Memes without likes are always last
+        self.group_start.setdefault(0, len(self.ranked) - 1)
+        self.group_size[0] = self.group_size.get(0, 0) + 1
+        return index
+    
+    def increment(self, index):
+        """Record one more like for a meme."""
+        likes = self.likes[index]
+        start = self.group_start[likes]
+        self._swap(self.position[index], start)
+        
+        self._leave_group(likes)
+        if likes in self.group_size:
+            self.group_start[likes] = start + 1
+        
+        # The group above, if any, ends right before start
+        self.likes[index] = likes + 1
+        if likes + 1 in self.group_size:
+            self.group_size[likes + 1] += 1
+        else:
+            self.group_start[likes + 1] = start
+            self.group_size[likes + 1] = 1
+    
+    def decrement(self, index):
+        """Record one less like for a meme."""
+        likes = self.likes[index]
+        end = self.group_start[likes] + self.group_size[likes] - 1
+        self._swap(self.position[index], end)
+        self._leave_group(likes)
+        
+        # The group below, if any, starts right after end
+        self.likes[index] = likes - 1
+        self.group_start[likes - 1] = end
+        self.group_size[likes - 1] = self.group_size.get(likes - 1, 0) + 1
+    
+    def top(self, limit, offset=0):
+        """
+        Get a page of the ranking.
+        
+        Args:
+            limit (int): Maximum number of memes
+            offset (int): Number of top memes to skip
+        
+        Returns:
+            list: Meme indices, most liked first
+        """
+        return self.ranked[offset:offset + limit]
+
+class WeightedSampler:
+    """
+    Fenwick tree of integer weights for O(log n) weighted random draws.
+    
+    Each slot stores the sum of a power-of-two run of weights ending at it, so
+    appending, changing one weight and drawing all walk O(log n) slots.
+    """
+    
+    def __init__(self, weights=()):
+        """
+        Initialize the sampler.
+        
+        Args:
+            weights (iterable): Initial non-negative integer weights
+        """
+        self.weights = []
+        self.tree = [0]  # 1-based
+        for weight in weights:
+            self.append(weight)
+    
+    def __len__(self):
+        """Return the number of weights."""
+        return len(self.weights)
+    
+    def _prefix(self, count):
+        """Return the sum of the first count weights."""
+        total = 0
+        while count:
+            total += self.tree[count]
+            count &= count - 1
+        return total
+    
+    def total(self):
+        """Return the sum of all weights."""
+        return self._prefix(len(self.weights))
+    
+    def append(self, weight):
+        """Add a weight at the next index."""
+        self.weights.append(weight)
+        slot = len(self.weights)
+        # The new slot covers the run (slot - lowbit(slot), slot]
+        self.tree.append(weight + self._prefix(slot - 1) - self._prefix(slot - (slot & -slot)))
+    
+    def add(self, index, delta):
+        """Change the weight at an index by delta."""
+        self.weights[index] += delta
+        slot = index + 1
+        while slot < len(self.tree):
+            self.tree[slot] += delta
+            slot += slot & -slot
+    
+    def sample(self, rng=random):
+        """
+        Draw an index with probability proportional to its weight.
+        
+        Returns:
+            int: Sampled index, or None if all weights are zero
+        """
+        total = self.total()
+        if total <= 0:
+            return None
+        
+        remaining = rng.randrange(total)
+        slot = 0
+        step = 1 << (len(self.weights).bit_length() - 1)
+        while step:
+            if slot + step <= len(self.weights) and self.tree[slot + step] <= remaining:
+                slot += step
+                remaining -= self.tree[slot]
+            step >>= 1
+        return slot
+
+class CommunityManager:
+    """
+    Manages community features.
+    
+    Safe for concurrent use. Users and statistics, each chat's rollups (by
+    lock stripe) and the memes are guarded by separate locks, so handlers for
+    different chats rarely wait on each other. When several are needed they
+    are taken in that order. Memes are returned as copies.
+    """
+    
+    def __init__(self, flush_interval=COMMUNITY_FLUSH_INTERVAL, flush_mutations=COMMUNITY_FLUSH_MUTATIONS):
+        """
+        Initialize the community manager.
+        
+        Args:
+            flush_interval (float): Seconds between write-behind flushes, or 0 to save on every change
+            flush_mutations (int): Number of changes that triggers an early flush
+        """
+        self.storage = COMMUNITY_STORAGE
+        self.memes_dirty = False
+        migrated = False
+        if self.storage == "sharded":
+            self.data, recent_activity, migrated = self._load_sharded()
+        else:
+            self.data = self._load_data()
+            self.data["users"] = UserStore.from_json(self.data["users"])
+            recent_activity = self.data["users"].recent_activity()
+        for meme in self.data["memes"]:
+            meme["liked_by"] = LikeSet.from_json(meme.get("liked_by", []))
+        self.data.setdefault("chats", {})
+        for chat in self.data["chats"].values():
+            for bucket in chat["daily"].values():
+                bucket["users"] = HyperLogLog.from_json(bucket["users"])
+        self.active_users = ActiveUserWindow()
+        self.active_users.load(recent_activity, time.time())
+        self.leaderboard = MemeLeaderboard()
+        self.leaderboard.load(self.data["memes"])
+        # Popular memes are drawn more often; every meme keeps a base weight of 1
+        self.meme_sampler = WeightedSampler(meme["likes"] + 1 for meme in self.data["memes"])
+        self.recent_memes = OrderedDict()  # Chat ID -> deque of recently shown meme indices
         
         # Ensure memes directory exists
         if not os.path.exists(MEMES_DIRECTORY):
             os.makedirs(MEMES_DIRECTORY)
+        
+        self.flush_interval = flush_interval
+        self.flush_mutations = flush_mutations
+        self.dirty = False
+        self.mutations = 0
+        self.version = 0  # Bumped on every change; keys the rendered stats cache
+        self.stats_messages = OrderedDict()  # Chat ID -> (version, rendered at, message)
+        self._lock = threading.RLock()  # Guards users, stats and write-behind state
+        self._chat_locks = StripedLock(CHAT_LOCK_STRIPES)  # Guard per-chat rollups
+        self._meme_lock = threading.RLock()  # Guards memes, the leaderboard and the sampler
+        self._write_lock = threading.Lock()  # Keeps flushes from overtaking each other
+        self._flush_event = threading.Event()
+        self._closed = False
+        self._flush_thread = None
+        
+        if self.flush_interval > 0:
+            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
+            atexit.register(self.close)
+        
+        if migrated:
+            self.dirty = True
+            self.memes_dirty = True
+            self.flush()
     
     def _load_data(self):
         """Load community data from file."""
         try:
-            if os.path.exists(COMMUNITY_DATA_FILE):
-                with open(COMMUNITY_DATA_FILE, 'r') as f:
-                    return json.load(f)
+            data = load_snapshot(COMMUNITY_DATA_FILE)
+            if data is not None:
+                return data
             return {
                 "users": {},
                 "memes": [],
@@ -66,15 +525,156 @@ class CommunityManager:
                 }
             }
     
+    def _load_sharded(self):
+        """
+        Load the sharded layout: meta and memes now, user shards on first use.
+        
+        If the layout does not exist yet, the single data file is split into it.
+        Meta is written last, so a directory without it holds at most an
+        unfinished split, which is redone. Existing sharded data is never
+        replaced: if its meta or memes cannot be read, loading fails instead of
+        migrating over it.
+        
+        Returns:
+            tuple: (data, recent activity as (user ID, last active) pairs, whether data was migrated)
+        """
+        os.makedirs(COMMUNITY_DATA_DIRECTORY, exist_ok=True)
+        users = ShardedUserStore(COMMUNITY_DATA_DIRECTORY)
+        migrated = False
+        
+        meta_file = os.path.join(COMMUNITY_DATA_DIRECTORY, "meta.json")
+        if not any(os.path.exists(path) for path in (meta_file, snapshot_file(meta_file))):
+            # No finished split yet: split the single data file, replacing anything an interrupted split left
+            meta = self._load_data()
+            memes = meta.pop("memes")
+            single_file_users = meta.pop("users")
+            users.import_users(single_file_users)
+            meta["recent_activity"] = [(user_id, user["last_active"]) for user_id, user in single_file_users.items()]
+            migrated = True
+        else:
+            try:
+                meta = load_snapshot(meta_file)
+                memes = load_snapshot(os.path.join(COMMUNITY_DATA_DIRECTORY, "memes.json")) or []
+            except Exception as e:
+                logger.error(
+                    f"Error loading community data from {COMMUNITY_DATA_DIRECTORY}: {e}. "
+                    "Restore the file from a backup; the sharded data is left untouched."
+                )
+                raise
+        
+        recent_activity = meta.pop("recent_activity", [])
+        meta["users"] = users
+        meta["memes"] = memes
+        return meta, recent_activity, migrated
+    
+    def _copy_data(self, memes=True):
+        """
+        Copy the data for serializing after the locks are released.
+        
+        Everything handlers change in place is copied: user columns, chat
+        counters and sketches, stats and meme dicts. Like sets replace their
+        arrays on change, so they are shared. Called with all data locks held.
+        
+        Args:
+            memes (bool): Whether to copy the memes too
+        
+        Returns:
+            dict: Copy of the data
+        """
+        data = {key: dict(value) if isinstance(value, dict) else value for key, value in self.data.items()}
+        if isinstance(self.data["users"], UserStore):
+            data["users"] = self.data["users"].copy()
+        data["memes"] = [dict(meme, liked_by=meme["liked_by"].copy()) for meme in self.data["memes"]] if memes else None
+        data["chats"] = {
+            chat_id: dict(
+                chat,
+                hourly=dict(chat["hourly"]),
+                daily={key: dict(bucket, users=bucket["users"].copy()) for key, bucket in chat["daily"].items()}
+            )
+            for chat_id, chat in self.data["chats"].items()
+        }
+        return data
+    
+    def _pending_writes(self):
+        """
+        Copy everything that needs writing. Called with all data locks held.
+        
+        Returns:
+            list: (shard or None, data file, data to serialize) tuples
+        """
+        if self.storage != "sharded":
+            return [(None, COMMUNITY_DATA_FILE, self._copy_data())]
+        
+        data = self._copy_data(memes=self.memes_dirty)
+        # Users active in the window are kept in meta so startup needs no user shards
+        meta = {key: value for key, value in data.items() if key not in ("users", "memes")}
+        meta["recent_activity"] = list(self.active_users.last_active.items())
+        writes = self.data["users"].pending_writes()
+        if self.memes_dirty:
+            writes.append((None, os.path.join(COMMUNITY_DATA_DIRECTORY, "memes.json"), data["memes"]))
+            self.memes_dirty = False
+        # Meta goes last: it marks the first split as finished
+        writes.append((None, os.path.join(COMMUNITY_DATA_DIRECTORY, "meta.json"), meta))
+        return writes
+    
     def _save_data(self):
-        """Save community data to file."""
-        try:
-            with open(COMMUNITY_DATA_FILE, 'w') as f:
-                json.dump(self.data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving community data: {e}")
+        """Record a change, saving it now or leaving it to the flush thread."""
+        with self._lock:
+            self.dirty = True
+            self.mutations += 1
+            self.version += 1
+            flush_now = self.mutations >= self.flush_mutations
+        
+        if self._flush_thread is None:
+            self.flush()
+        elif flush_now:
+            self._flush_event.set()
+    
+    def flush(self):
+        """Write community data to file if it has unsaved changes."""
+        with self._write_lock:
+            with self._lock, self._chat_locks.all(), self._meme_lock:
+                if not self.dirty:
+                    return
+                try:
+                    writes = self._pending_writes()
+                except Exception as e:
+                    logger.error(f"Error saving community data: {e}")
+                    return
+                self.dirty = False
+                self.mutations = 0
+            
+            # Serialize and write outside the data locks so handlers are not held up by encoding or disk I/O
+            for index, (shard, path, data) in enumerate(writes):
+                try:
+                    write_snapshot(path, serialize_snapshot(data, default=_encode_json))
+                except Exception as e:
+                    # Stop here, so meta is never written over shards that failed; the rest is retried next flush
+                    logger.error(f"Error saving community data: {e}")
+                    with self._lock, self._meme_lock:
+                        self.dirty = True
+                        self.memes_dirty = self.memes_dirty or any(later.endswith("memes.json") for _, later, _ in writes[index:])
+                    break
+                if shard is not None:
+                    with self._lock:
+                        self.data["users"].written(shard, data)
+    
+    def _flush_loop(self):
+        """Flush changes every flush interval, or sooner after many changes."""
+        while not self._closed:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+    
+    def close(self):
+        """Stop the flush thread and write any unsaved changes."""
+        self._closed = True
+        self._flush_event.set()
+        if self._flush_thread is not None and self._flush_thread is not threading.current_thread():
+            self._flush_thread.join(timeout=10)
+        self.flush()
     
-    def register_user_activity(self, user_id, username=None, first_name=None, last_name=None):
+    def register_user_activity(self, user_id, username=None, first_name=None, last_name=None, chat_id=None):
         """
         Register user activity.
         
@@ -83,46 +683,60 @@ class CommunityManager:
             username (str, optional): Telegram username
             first_name (str, optional): User's first name
             last_name (str, optional): User's last name
+            chat_id (int, optional): Chat the activity happened in, for per-chat statistics
         """
         user_id = str(user_id)
         current_time = time.time()
         
-        if user_id not in self.data["users"]:
-            # New user
-            self.data["users"][user_id] = {
-                "username": username,
-                "first_name": first_name,
-                "last_name": last_name,
-                "first_seen": current_time,
-                "last_active": current_time,
-                "message_count": 1
-            }
-            self.data["stats"]["total_users"] += 1
-        else:
-            # Existing user
-            self.data["users"][user_id]["last_active"] = current_time
-            self.data["users"][user_id]["message_count"] += 1
+        with self._lock:
+            # Add new users, or update existing ones with any user info provided
+            if self.data["users"].record_activity(user_id, current_time, username, first_name, last_name):
+                self.data["stats"]["total_users"] += 1
             
-            # Update user info if provided
-            if username:
-                self.data["users"][user_id]["username"] = username
-            if first_name:
-                self.data["users"][user_id]["first_name"] = first_name
-            if last_name:
-                self.data["users"][user_id]["last_name"] = last_name
-        
-        # Update stats
-        self.data["stats"]["total_messages"] += 1
-        self.data["stats"]["last_updated"] = current_time
-        
-        # Calculate active users (active in the last 24 hours)
-        active_count = 0
-        for user in self.data["users"].values():
-            if current_time - user["last_active"] < 86400:  # 24 hours in seconds
-                active_count += 1
-        self.data["stats"]["active_users"] = active_count
+            # Update stats
+            self.data["stats"]["total_messages"] += 1
+            self.data["stats"]["last_updated"] = current_time
+            
+            # Update active users (active in the last 24 hours)
+            self.active_users.touch(user_id, current_time)
+            self.data["stats"]["active_users"] = len(self.active_users)
+        
+        if chat_id is not None:
+            with self._chat_locks.lock(chat_id):
+                self._record_chat_activity(chat_id, user_id, current_time)
         
         self._save_data()
+        event_log.record("message", user_id, chat_id, timestamp=current_time)
+    
+    def _record_chat_activity(self, chat_id, user_id, current_time):
+        """
+        Add one message to a chat's hourly and daily rollups.
+        
+        Hourly buckets count messages; daily buckets also keep a HyperLogLog of
+        the users seen that day. Old buckets are dropped when a new one starts,
+        so each chat takes a bounded amount of memory.
+        """
+        chat = self.data["chats"].setdefault(str(chat_id), {"messages": 0, "hourly": {}, "daily": {}})
+        chat["messages"] += 1
+        
+        hour = int(current_time // 3600)
+        if str(hour) not in chat["hourly"]:
+            chat["hourly"] = {
+                key: count for key, count in chat["hourly"].items()
+                if int(key) > hour - CHAT_HOURLY_BUCKETS
+            }
+            chat["hourly"][str(hour)] = 0
+        chat["hourly"][str(hour)] += 1
+        
+        day = int(current_time // 86400)
+        if str(day) not in chat["daily"]:
+            chat["daily"] = {
+                key: bucket for key, bucket in chat["daily"].items()
+                if int(key) > day - CHAT_DAILY_BUCKETS
+            }
+            chat["daily"][str(day)] = {"messages": 0, "users": HyperLogLog()}
+        chat["daily"][str(day)]["messages"] += 1
+        chat["daily"][str(day)]["users"].add(user_id)
     
     def add_meme(self, file_id, user_id, caption=None):
         """
@@ -145,38 +759,86 @@ class CommunityManager:
             "caption": caption,
             "submitted_at": current_time,
             "likes": 0,
-            "liked_by": []
+            "liked_by": LikeSet()
         }
         
-        self.data["memes"].append(meme)
+        with self._meme_lock:
+            self.data["memes"].append(meme)
+            meme_index = self.leaderboard.add()
+            self.meme_sampler.append(1)
+            self.memes_dirty = True
         self._save_data()
+        event_log.record("meme", user_id, meme_index=meme_index, timestamp=current_time)
         
-        return len(self.data["memes"]) - 1
+        return meme_index
     
-    def get_random_meme(self):
+    def get_random_meme(self, chat_id=None):
         """
-        Get a random meme from the collection.
+        Get a random meme from the collection, favouring memes with more likes.
+        
+        Args:
+            chat_id (int, optional): Chat the meme is for; memes recently shown there are skipped
         
         Returns:
-            dict: Meme data or None if no memes
+            dict: Copy of the meme data or None if no memes
         """
-        if not self.data["memes"]:
-            return None
+        with self._meme_lock:
+            if not self.data["memes"]:
+                return None
+            
+            if chat_id is None:
+                return self._copy_meme(self.meme_sampler.sample())
+            
+            history = self.recent_memes.pop(chat_id, None) or deque(maxlen=MEME_HISTORY_SIZE)
+            self.recent_memes[chat_id] = history
+            if len(self.recent_memes) > MEME_HISTORY_CHATS:
+                self.recent_memes.popitem(last=False)
+            
+            # Leave at least one meme eligible
+            excluded = set(list(history)[len(history) - min(len(history), len(self.data["memes"]) - 1):])
+            meme_index = self._sample_excluding(excluded)
+            history.append(meme_index)
+            return self._copy_meme(meme_index)
+    
+    def _copy_meme(self, meme_index):
+        """Copy a meme for a reader, so later likes do not change it underneath them."""
+        meme = self.data["memes"][meme_index]
+        return dict(meme, liked_by=meme["liked_by"].copy())
+    
+    def _sample_excluding(self, excluded):
+        """
+        Draw a weighted meme index that is not in the excluded set.
+        
+        A few plain draws usually succeed; otherwise the excluded memes are given
+        zero weight for one exact draw and then restored.
+        """
+        for _ in range(MEME_SAMPLE_ATTEMPTS):
+            meme_index = self.meme_sampler.sample()
+            if meme_index not in excluded:
+                return meme_index
         
-        return random.choice(self.data["memes"])
+        weights = {meme_index: self.meme_sampler.weights[meme_index] for meme_index in excluded}
+        for meme_index, weight in weights.items():
+            self.meme_sampler.add(meme_index, -weight)
+        try:
+            return self.meme_sampler.sample()
+        finally:
+            for meme_index, weight in weights.items():
+                self.meme_sampler.add(meme_index, weight)
     
-    def get_top_memes(self, limit=5):
+    def get_top_memes(self, limit=5, offset=0):
         """
         Get the top memes by likes.
         
         Args:
             limit (int): Maximum number of memes to return
+            offset (int): Number of top memes to skip, for leaderboard pages
         
         Returns:
-            list: List of top memes
+            list: Copies of the top memes
         """
-        sorted_memes = sorted(self.data["memes"], key=lambda m: m["likes"], reverse=True)
-        return sorted_memes[:limit]
+        with self._meme_lock:
+            return [self._copy_meme(index) for index in self.leaderboard.top(limit, offset)]
     
     def like_meme(self, meme_index, user_id):
         """
@@ -189,31 +851,75 @@ class CommunityManager:
         Returns:
             bool: True if the meme was liked successfully, False otherwise
         """
-        user_id = str(user_id)
-        
         if meme_index < 0 or meme_index >= len(self.data["memes"]):
             return False
         
         meme = self.data["memes"][meme_index]
         
-        # Check if the user already liked this meme
-        if user_id in meme["liked_by"]:
+        with self._meme_lock:
+            # Skip users who already liked this meme
+            if not meme["liked_by"].add(user_id):
+                return False
+            
+            meme["likes"] += 1
+            self.leaderboard.increment(meme_index)
+            self.meme_sampler.add(meme_index, 1)
+            self.memes_dirty = True
+        
+        self._save_data()
+        event_log.record("like", user_id, meme_index=meme_index)
+        return True
+    
+    def unlike_meme(self, meme_index, user_id):
+        """
+        Take back a like.
+        
+        Args:
+            meme_index (int): Index of the meme
+            user_id (int): User who liked the meme
+        
+        Returns:
+            bool: True if the like was removed, False if the user had not liked the meme
+        """
+        if meme_index < 0 or meme_index >= len(self.data["memes"]):
             return False
         
-        meme["likes"] += 1
-        meme["liked_by"].append(user_id)
+        meme = self.data["memes"][meme_index]
+        
+        with self._meme_lock:
+            if not meme["liked_by"].discard(user_id):
+                return False
+            
+            meme["likes"] -= 1
+            self.leaderboard.decrement(meme_index)
+            self.meme_sampler.add(meme_index, -1)
+            self.memes_dirty = True
         
         self._save_data()
+        event_log.record("unlike", user_id, meme_index=meme_index)
         return True
     
+    def record_alert_trigger(self, user_id, chat_id, alert_type, price):
+        """
+        Record a triggered price alert in the event log.
+        
+        Args:
+            user_id (int): User who owns the alert
+            chat_id (int): Chat the alert was sent to
+            alert_type (str): Type of the alert
+            price (float): Price that triggered it
+        """
+        event_log.record("alert_trigger", user_id, chat_id, alert_type=alert_type, price=price)
+    
     def get_community_stats(self):
         """
         Get community statistics.
         
         Returns:
-            dict: Community statistics
+            dict: Copy of the community statistics
         """
-        return self.data["stats"]
+        with self._lock:
+            return dict(self.data["stats"])
     
     def get_user_stats(self, user_id):
         """
@@ -225,16 +931,72 @@ class CommunityManager:
         Returns:
             dict: User statistics or None if user not found
         """
-        user_id = str(user_id)
-        return self.data["users"].get(user_id)
+        with self._lock:
+            return self.data["users"].get_dict(user_id)
+    
+    def get_chat_stats(self, chat_id):
+        """
+        Get activity statistics for a chat.
+        
+        Unique user counts are HyperLogLog estimates over calendar days (UTC):
+        today, the last 7 days and the last 30 days.
+        
+        Args:
+            chat_id (int): Telegram chat ID
+        
+        Returns:
+            dict: Chat statistics or None if the chat has no recorded activity
+        """
+        with self._chat_locks.lock(chat_id):
+            chat = self.data["chats"].get(str(chat_id))
+            if not chat:
+                return None
+            
+            current_time = time.time()
+            hour = int(current_time // 3600)
+            day = int(current_time // 86400)
+            
+            def unique_users(days):
+                return HyperLogLog.union(
+                    bucket["users"] for key, bucket in chat["daily"].items() if int(key) > day - days
+                ).count()
+            
+            return {
+                "messages": chat["messages"],
+                "messages_24h": sum(count for key, count in chat["hourly"].items() if int(key) > hour - 24),
+                "daily_active": unique_users(1),
+                "weekly_active": unique_users(7),
+                "monthly_active": unique_users(30)
+            }
     
-    def format_community_stats_message(self):
+    def format_community_stats_message(self, chat_id=None):
         """
         Format a message with community statistics.
         
+        Args:
+            chat_id (int, optional): Chat to include statistics for
+        
         Returns:
             str: Formatted message
         """
+        current_time = time.time()
+        with self._lock:
+            cached = self.stats_messages.get(chat_id)
+            # Every message bumps the version, so during a burst of activity a
+            # rendered message is also reused for a few seconds
+            if cached and (cached[0] == self.version or current_time - cached[1] < COMMUNITY_STATS_CACHE_TTL):
+                self.stats_messages.move_to_end(chat_id)
+                return cached[2]
+            version = self.version
+            message = self._render_stats_message(chat_id)
+            self.stats_messages[chat_id] = (version, current_time, message)
+            self.stats_messages.move_to_end(chat_id)
+            if len(self.stats_messages) > STATS_CACHE_CHATS:
+                self.stats_messages.popitem(last=False)
+        return message
+    
+    def _render_stats_message(self, chat_id):
+        """Build the community statistics message for format_community_stats_message()."""
         stats = self.get_community_stats()
         
         message = (
@@ -243,9 +1005,20 @@ class CommunityManager:
             f"*Active Users (24h):* {stats['active_users']}\n"
             f"*Total Messages:* {stats['total_messages']}\n"
             f"*Total Memes:* {len(self.data['memes'])}\n\n"
-            f"Last updated: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats['last_updated']))}"
         )
         
+        chat_stats = self.get_chat_stats(chat_id) if chat_id is not None else None
+        if chat_stats:
+            message += (
+                "💬 *This Chat* 💬\n"
+                f"*Messages (24h):* {chat_stats['messages_24h']}\n"
+                f"*Active Today:* {chat_stats['daily_active']}\n"
+                f"*Active This Week:* {chat_stats['weekly_active']}\n"
+                f"*Active This Month:* {chat_stats['monthly_active']}\n\n"
+            )
+        
+        message += f"Last updated: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats['last_updated']))}"
+        
         return message
 
 # Create a singleton instance
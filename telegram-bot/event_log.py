@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Event Log
+Batched columnar log of community activity for offline analysis
+
+Events are buffered in memory as columns and written in batches to
+EVENT_LOG_DIRECTORY, partitioned by UTC day:
+
+    events/date=2026-01-31/events.parquet                      (with pyarrow, closed days)
+    events/date=2026-02-01/events-1769904000123-0001.parquet   (with pyarrow, the current day)
+    events/date=2026-02-01/events.csv                          (without)
+
+Each Parquet batch is its own file until its day is over; the day's files are
+then compacted into one events.parquet. Partitions older than
+EVENT_LOG_RETENTION_DAYS are deleted.
+
+The Parquet layout can be read directly as a dataset, e.g. with
+pyarrow.dataset.dataset("events", partitioning="hive") or DuckDB's
+read_parquet("events/*/*.parquet", hive_partitioning=true). The CSV files
+have a fixed header, but their mostly empty columns need the schema given,
+as in arrow_schema(): see the README.
+"""
+
+import os
+import csv
+import glob
+import time
+import shutil
+import atexit
+import logging
+import threading
+from dotenv import load_dotenv
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; events are then written as CSV
+    pa = None
+    pq = None
+
+# Load environment variables
+load_dotenv()
+
+# Enable logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+EVENT_LOG_DIRECTORY = os.getenv("EVENT_LOG_DIRECTORY", "events")
+EVENT_LOG_FORMAT = os.getenv("EVENT_LOG_FORMAT", "auto")  # 'auto', 'parquet', 'csv' or 'none'
+EVENT_LOG_FLUSH_INTERVAL = float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "60"))  # Seconds between batch writes
+EVENT_LOG_BATCH_SIZE = int(os.getenv("EVENT_LOG_BATCH_SIZE", "10000"))  # or after this many events
+EVENT_LOG_RETENTION_DAYS = int(os.getenv("EVENT_LOG_RETENTION_DAYS", "90"))  # Days of partitions kept; 0 keeps all
+EVENT_TYPES = ("message", "like", "unlike", "meme", "alert_trigger")
+# Column name -> Arrow type; every event has all columns, unused ones are empty
+COLUMNS = {
+    "timestamp": "float64",
+    "event": "string",
+    "user_id": "string",
+    "chat_id": "string",
+    "meme_index": "int64",
+    "alert_type": "string",
+    "price": "float64"
+}
+
+def arrow_schema():
+    """
+    Get the Arrow schema of the event columns.
+    
+    Returns:
+        pyarrow.Schema: The schema
+    """
+    return pa.schema([(name, getattr(pa, arrow_type)()) for name, arrow_type in COLUMNS.items()])
+
+class EventLog:
+    """
+    Buffers events and writes them in daily-partitioned batches.
+    
+    Recording an event only appends to in-memory column lists; a background
+    thread writes a batch every flush_interval seconds, or sooner once
+    batch_size events are waiting. Parquet files are never appended to, so each
+    batch becomes its own file, and once a day is over its files are compacted
+    into one; CSV batches are appended to one file per day. A batch that fails
+    to write is kept for the next flush.
+    """
+    
+    def __init__(self, directory=EVENT_LOG_DIRECTORY, file_format=EVENT_LOG_FORMAT,
+                 flush_interval=EVENT_LOG_FLUSH_INTERVAL, batch_size=EVENT_LOG_BATCH_SIZE,
+                 retention_days=EVENT_LOG_RETENTION_DAYS):
+        """
+        Initialize the event log.
+        
+        Args:
+            directory (str): Directory for the daily partitions
+            file_format (str): 'parquet', 'csv', 'auto' for Parquet when pyarrow is installed, or 'none' to disable
+            flush_interval (float): Seconds between batch writes, or 0 to write on every event
+            batch_size (int): Number of buffered events that triggers an early write
+            retention_days (int): Days of partitions kept, or 0 to keep every day
+        """
+        if file_format == "auto":
+            file_format = "parquet" if pq is not None else "csv"
+        elif file_format == "parquet" and pq is None:
+            logger.warning("pyarrow is not installed, writing the event log as CSV")
+            file_format = "csv"
+        
+        self.directory = directory
+        self.file_format = file_format
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self.maintained_day = None  # UTC day when closed days were last compacted and expired
+        self.columns = {name: [] for name in COLUMNS}
+        self.sequence = 0  # Distinguishes Parquet files written in the same millisecond
+        self._lock = threading.Lock()  # Guards the buffered columns
+        self._write_lock = threading.Lock()  # Keeps batch writes in order
+        self._flush_event = threading.Event()
+        self._closed = False
+        self._flush_thread = None
+        
+        if self.enabled and self.flush_interval > 0:
+            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
+            atexit.register(self.close)
+    
+    @property
+    def enabled(self):
+        """Whether events are being recorded."""
+        return self.file_format != "none"
+    
+    def __len__(self):
+        """Return the number of buffered events."""
+        return len(self.columns["timestamp"])
+    
+    def record(self, event, user_id=None, chat_id=None, meme_index=None, alert_type=None, price=None, timestamp=None):
+        """
+        Record an event.
+        
+        Args:
+            event (str): Event type (one of EVENT_TYPES)
+            user_id (int, optional): User the event is about
+            chat_id (int, optional): Chat the event happened in
+            meme_index (int, optional): Meme liked, unliked or submitted
+            alert_type (str, optional): Type of a triggered alert
+            price (float, optional): Price that triggered an alert
+            timestamp (float, optional): Time of the event. Defaults to now.
+        """
+        if not self.enabled:
+            return
+        
+        row = (
+            time.time() if timestamp is None else timestamp,
+            event,
+            None if user_id is None else str(user_id),
+            None if chat_id is None else str(chat_id),
+            meme_index,
+            alert_type,
+            price
+        )
+        with self._lock:
+            for column, value in zip(self.columns.values(), row):
+                column.append(value)
+            pending = len(self)
+        
+        if self._flush_thread is None:
+            self.flush()
+        elif pending >= self.batch_size:
+            self._flush_event.set()
+    
+    def flush(self):
+        """Write all buffered events, then compact and expire closed days once a day."""
+        with self._write_lock:
+            with self._lock:
+                columns = self.columns if len(self) else None
+                if columns is not None:
+                    self.columns = {name: [] for name in COLUMNS}
+            
+            if columns is not None:
+                for day, rows in self._split_by_day(columns).items():
+                    try:
+                        partition = os.path.join(self.directory, f"date={day}")
+                        os.makedirs(partition, exist_ok=True)
+                        if self.file_format == "parquet":
+                            self._write_parquet(partition, rows)
+                        else:
+                            self._write_csv(partition, rows)
+                    except Exception as e:
+                        logger.error(f"Error writing event log, keeping {len(rows['timestamp'])} events for the next flush: {e}")
+                        self._restore(rows)
+            
+            self._maintain()
+    
+    def _restore(self, rows):
+        """Put events that failed to write back in front of the buffer."""
+        with self._lock:
+            for name, values in rows.items():
+                self.columns[name][:0] = values
+    
+    @staticmethod
+    def _split_by_day(columns):
+        """
+        Split buffered columns into one set of columns per UTC day.
+        
+        Returns:
+            dict: 'YYYY-MM-DD' -> columns
+        """
+        days = [time.strftime('%Y-%m-%d', time.gmtime(timestamp)) for timestamp in columns["timestamp"]]
+        if len(set(days)) == 1:
+            return {days[0]: columns}
+        
+        split = {}
+        for position, day in enumerate(days):
+            rows = split.setdefault(day, {name: [] for name in COLUMNS})
+            for name, values in columns.items():
+                rows[name].append(values[position])
+        return split
+    
+    def _write_parquet(self, partition, columns):
+        """Write one batch as a new Parquet file in a day's partition."""
+        self.sequence += 1
+        path = os.path.join(partition, f"events-{int(time.time() * 1000)}-{self.sequence:04d}.parquet")
+        table = pa.Table.from_pydict(columns, schema=arrow_schema())
+        # Write under a name readers skip, so a crash never leaves a truncated file in the dataset
+        tmp_path = os.path.join(partition, f".{os.path.basename(path)}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+    
+    def _write_csv(self, partition, columns):
+        """Append one batch to a day's CSV file."""
+        path = os.path.join(partition, "events.csv")
+        new_file = not os.path.exists(path)
+        with open(path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(COLUMNS)
+            writer.writerows(zip(*columns.values()))
+    
+    def _maintain(self):
+        """Compact the Parquet files of closed days and delete expired days, on the first flush of each day."""
+        today = time.strftime('%Y-%m-%d', time.gmtime())
+        if today == self.maintained_day or not os.path.isdir(self.directory):
+            return
+        
+        expired = time.strftime('%Y-%m-%d', time.gmtime(time.time() - self.retention_days * 86400))
+        try:
+            for name in sorted(os.listdir(self.directory)):
+                if not name.startswith("date="):
+                    continue
+                day = name[len("date="):]
+                partition = os.path.join(self.directory, name)
+                if self.retention_days and day < expired:
+                    shutil.rmtree(partition)
+                elif day < today and pq is not None:
+                    self._compact(partition)
+            self.maintained_day = today
+        except Exception as e:
+            logger.error(f"Error maintaining event log: {e}")
+    
+    def _compact(self, partition):
+        """
+        Merge a closed day's Parquet batch files into one events.parquet.
+        
+        The merged file is finished under a hidden name before any batch file is
+        deleted, and only renamed into place after they are all gone, so a crash
+        at any point loses no events and leaves none in the dataset twice; the
+        next compaction completes or redoes the interrupted one.
+        """
+        tmp_path = os.path.join(partition, ".events.parquet.tmp")
+        done_path = os.path.join(partition, ".events.parquet.done")
+        path = os.path.join(partition, "events.parquet")
+        batches = sorted(glob.glob(os.path.join(partition, "events-*.parquet")))
+        
+        if not os.path.exists(done_path):
+            if not batches:
+                return
+            inputs = ([path] if os.path.exists(path) else []) + batches
+            table = pa.concat_tables(pq.ParquetFile(input_path).read() for input_path in inputs)
+            pq.write_table(table.cast(arrow_schema()), tmp_path, compression="zstd")
+            os.replace(tmp_path, done_path)
+        
+        for batch in batches:
+            os.remove(batch)
+        os.replace(done_path, path)
+    
+    def _flush_loop(self):
+        """Write buffered events periodically until closed."""
+        while not self._closed:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+    
+    def close(self):
+        """Stop the background thread and write any buffered events."""
+        self._closed = True
+        self._flush_event.set()
+        if self._flush_thread is not None and self._flush_thread is not threading.current_thread():
+            self._flush_thread.join(timeout=5)
+        self.flush()
+
+# Create a singleton instance
+event_log = EventLog()
+
+if __name__ == "__main__":
+    # Test the event log
+    print(f"Testing event log ({event_log.file_format})...")
+    
+    event_log.record("message", 123456, -100123)
+    event_log.record("like", 123456, meme_index=0)
+    event_log.record("alert_trigger", 123456, 123456, alert_type="price_above", price=0.0001)
+    event_log.flush()
+    
+    for root, _, files in os.walk(event_log.directory):
+        for name in files:
+            print(os.path.join(root, name))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX HyperLogLog
+Approximate unique counting in constant memory
+"""
+
+import math
+import base64
+import hashlib
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch of a set of values.
+    
+    Each value is hashed to 64 bits; the top bits pick a register and the
+    register keeps the longest run of leading zeros seen in the rest. With the
+    default precision of 10 a sketch takes 1 KB and counts with about 3% error,
+    however many values are added. Sketches can be merged to count a union.
+    """
+    
+    def __init__(self, precision=10, registers=None):
+        """
+        Initialize the sketch.
+        
+        Args:
+            precision (int): Number of hash bits used to pick a register (4-16)
+            registers (bytes, optional): Register values to start from
+        """
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+    
+    def add(self, value):
+        """
+        Add a value to the set.
+        
+        Args:
+            value: Value to add; it is hashed by its string form
+        """
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def merge(self, other):
+        """
+        Add all values of another sketch with the same precision.
+        
+        Args:
+            other (HyperLogLog): Sketch to merge in
+        """
+        self.registers = bytearray(map(max, self.registers, other.registers))
+    
+    def count(self):
+        """
+        Estimate the number of distinct values added.
+        
+        Returns:
+            int: Estimated count
+        """
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        # Linear counting is more accurate while many registers are still empty
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+    
+    @classmethod
+    def union(cls, sketches, precision=10):
+        """
+        Build a sketch of the union of several sketches.
+        
+        Args:
+            sketches (iterable): Sketches to combine
+            precision (int): Precision of the sketches
+        
+        Returns:
+            HyperLogLog: Combined sketch
+        """
+        combined = cls(precision)
+        for sketch in sketches:
+            combined.merge(sketch)
+        return combined
+    
+    def copy(self):
+        """Return a copy of the sketch."""
+        return HyperLogLog(self.precision, self.registers)
+    
+    def to_json(self):
+        """
+        Encode the sketch for a JSON file.
+        
+        Returns:
+            str: Base64 of the registers
+        """
+        return base64.b64encode(bytes(self.registers)).decode('ascii')
+    
+    @classmethod
+    def from_json(cls, text):
+        """
+        Decode a sketch written by to_json().
+        
+        Args:
+            text (str): Encoded sketch
+        
+        Returns:
+            HyperLogLog: The decoded sketch
+        """
+        registers = base64.b64decode(text)
+        return cls(len(registers).bit_length() - 1, registers)
+
+if __name__ == "__main__":
+    # Test the sketch
+    print("Testing HyperLogLog...")
+    
+    sketch = HyperLogLog()
+    for user_id in range(100000):
+        sketch.add(user_id)
+    print(f"100000 distinct values, estimate {sketch.count()}")
+    
+    restored = HyperLogLog.from_json(sketch.to_json())
+    print(f"Round trip estimate {restored.count()}")
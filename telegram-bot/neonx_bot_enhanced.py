@@ -7,17 +7,21 @@ A feature-rich bot for the NeonX meme coin on Solana with price tracking, alerts
 """
 
 import os
+import sys
+import math
 import time
 import json
 import logging
+import signal
 import threading
 import requests
 from dotenv import load_dotenv
 
 # Import our custom modules
-from price_tracker import get_formatted_price_message, fetch_price_data
-from alerts_manager import alerts_manager
+from price_tracker import get_formatted_price_message, get_price_summary_message, fetch_price_data
+from alerts_manager import alerts_manager, WINDOWED_ALERT_TYPES
 from community_manager import community_manager
+from alert_dispatcher import AlertDispatcher
 
 # Load environment variables
 load_dotenv()
@@ -37,6 +41,7 @@ WEBSITE_URL = "https://neonxcoin.xyz"
 TELEGRAM_GROUP = "https://t.me/neonxcoin_sol"
 TWITTER_URL = "https://twitter.com/"  # Update with your Twitter handle
 CHAT_ID = os.getenv("CHAT_ID")  # Admin chat ID for notifications
+ALERT_POLL_INTERVAL = int(os.getenv("ALERT_POLL_INTERVAL", "300"))  # Seconds between price alert checks
 
 # Telegram API URL
 API_URL = f"https://api.telegram.org/bot{BOT_TOKEN}"
@@ -78,6 +83,9 @@ def send_photo(chat_id, photo, caption=None, reply_markup=None):
     response = requests.post(url, data=data)
     return response.json()
 
+# Delivers alert notifications concurrently within Telegram's rate limits
+alert_dispatcher = AlertDispatcher(send_message)
+
 def get_updates(offset=None):
     """Get updates from Telegram."""
     url = f"{API_URL}/getUpdates"
@@ -96,7 +104,7 @@ def handle_message(message):
     last_name = message["from"].get("last_name")
 
     # Register user activity
-    community_manager.register_user_activity(user_id, username, first_name, last_name)
+    community_manager.register_user_activity(user_id, username, first_name, last_name, chat_id)
 
     # Check if this is a text message
     if "text" in message:
@@ -143,6 +151,8 @@ def handle_user_state(user_id, chat_id, text, message):
     if state["action"] == "set_alert":
         try:
             threshold = float(text)
+            if not math.isfinite(threshold):
+                raise ValueError(f"Threshold must be a finite number: {text}")
             alert_type = state["alert_type"]
 
             success = alerts_manager.add_alert(user_id, alert_type, threshold, chat_id)
@@ -342,11 +352,20 @@ def handle_alerts(chat_id, user_id):
                 message += f"{i+1}. Alert when price goes below {alert['threshold']}\n"
             elif alert["type"] == "percent_change":
                 message += f"{i+1}. Alert when price changes by {alert['threshold']}% or more\n"
+            elif alert["type"] in WINDOWED_ALERT_TYPES:
+                _, window_description = WINDOWED_ALERT_TYPES[alert["type"]]
+                message += f"{i+1}. Alert when price changes by {alert['threshold']}% or more within {window_description}\n"
 
         message += "\nUse /setalert to set a new alert."
 
+    # Remove buttons refer to alerts by ID, so they stay valid after other removals
+    remove_buttons = [
+        {"text": f"❌ Remove {i+1}", "callback_data": f"remove_alert:{alert['id']}"}
+        for i, alert in enumerate(user_alerts)
+    ]
+
     keyboard = {
-        "inline_keyboard": [
+        "inline_keyboard": [remove_buttons[i:i+3] for i in range(0, len(remove_buttons), 3)] + [
             [{"text": "➕ Set New Alert", "callback_data": "set_alert"}],
             [{"text": "🔙 Back to Menu", "callback_data": "start"}]
         ]
@@ -380,6 +399,8 @@ def handle_set_alert(chat_id, user_id, text):
         try:
             alert_type = parts[1].lower()
             threshold = float(parts[2])
+            if not math.isfinite(threshold):
+                raise ValueError(f"Threshold must be a finite number: {parts[2]}")
 
             if alert_type in ["above", "up"]:
                 success = alerts_manager.add_alert(user_id, "price_above", threshold, chat_id)
@@ -395,6 +416,21 @@ def handle_set_alert(chat_id, user_id, text):
                 else:
                     send_message(chat_id, "❌ You already have this alert set up.")
 
+            elif alert_type in ["percent", "change", "%"] and len(parts) > 3:
+                # Windowed percent change, e.g. /setalert percent 5 1h
+                windowed_type = f"percent_change_{parts[3].lower()}"
+                if windowed_type not in WINDOWED_ALERT_TYPES:
+                    windows = ", ".join(t.rsplit("_", 1)[1] for t in WINDOWED_ALERT_TYPES)
+                    send_message(chat_id, f"❌ Invalid window. Use one of: {windows}.")
+                    return
+
+                _, window_description = WINDOWED_ALERT_TYPES[windowed_type]
+                success = alerts_manager.add_alert(user_id, windowed_type, threshold, chat_id)
+                if success:
+                    send_message(chat_id, f"✅ Alert set! You will be notified when the price changes by {threshold}% or more within {window_description}.")
+                else:
+                    send_message(chat_id, "❌ You already have this alert set up.")
+
             elif alert_type in ["percent", "change", "%"]:
                 success = alerts_manager.add_alert(user_id, "percent_change", threshold, chat_id)
                 if success:
@@ -411,12 +447,13 @@ def handle_set_alert(chat_id, user_id, text):
                 "❌ Invalid format. Use:\n"
                 "/setalert above 0.0001\n"
                 "/setalert below 0.00005\n"
-                "/setalert percent 5"
+                "/setalert percent 5\n"
+                "/setalert percent 5 1h"
             )
 
 def handle_meme(chat_id):
     """Handle the /meme command."""
-    meme = community_manager.get_random_meme()
+    meme = community_manager.get_random_meme(chat_id)
 
     if not meme:
         message = (
@@ -461,17 +498,12 @@ def handle_photo(chat_id, user_id, message):
 
 def handle_stats(chat_id):
     """Handle the /stats command."""
-    stats_message = community_manager.format_community_stats_message()
-
-    # Add price information
-    price_data = fetch_price_data()
-    if price_data.get("success", False) or price_data.get("price") != "N/A":
-        stats_message += "\n\n" + (
-            "💰 *Current Price Information* 💰\n"
-            f"*Price:* {price_data['price']}\n"
-            f"*Market Cap:* {price_data['market_cap']}\n"
-            f"*Holders:* {price_data['holders']}"
-        )
+    stats_message = community_manager.format_community_stats_message(chat_id)
+
+    # Add price information; both parts are cached until their data changes
+    price_summary = get_price_summary_message()
+    if price_summary:
+        stats_message += "\n\n" + price_summary
 
     keyboard = {
         "inline_keyboard": [
@@ -500,7 +532,8 @@ def handle_callback_query(callback_query):
         user_id,
         callback_query["from"].get("username"),
         callback_query["from"].get("first_name"),
-        callback_query["from"].get("last_name")
+        callback_query["from"].get("last_name"),
+        chat_id
     )
 
     # Handle different callback data
@@ -523,6 +556,13 @@ def handle_callback_query(callback_query):
         handle_alerts(chat_id, user_id)
     elif data == "set_alert":
         handle_set_alert(chat_id, user_id, "/setalert")
+    elif data.startswith("remove_alert:"):
+        alert_id = data.split(":", 1)[1]
+        if alerts_manager.remove_alert(user_id, alert_id):
+            send_message(chat_id, "✅ Alert removed.")
+        else:
+            send_message(chat_id, "❌ That alert no longer exists.")
+        handle_alerts(chat_id, user_id)
     elif data == "alert_above":
         send_message(chat_id, "Please enter the price threshold for your alert (e.g., 0.0001):")
         user_states[user_id] = {
@@ -567,16 +607,23 @@ def check_price_alerts():
                 triggered_alerts = alerts_manager.check_alerts(current_price, previous_price)
 
                 # Send notifications for triggered alerts
+                alert_dispatcher.dispatch([
+                    (alert_data["chat_id"], alerts_manager.format_alert_message(alert_data))
+                    for alert_data in triggered_alerts
+                ])
                 for alert_data in triggered_alerts:
-                    chat_id = alert_data["chat_id"]
-                    message = alerts_manager.format_alert_message(alert_data)
-                    send_message(chat_id, message)
+                    community_manager.record_alert_trigger(
+                        alert_data["user_id"],
+                        alert_data["chat_id"],
+                        alert_data["alert"]["type"],
+                        alert_data["current_price"]
+                    )
 
                 # Update last price data
                 last_price_data = current_data
 
-            # Sleep for 5 minutes
-            time.sleep(300)
+            # Sleep until the next check (5 minutes by default)
+            time.sleep(ALERT_POLL_INTERVAL)
 
         except Exception as e:
             logger.error(f"Error in price alert thread: {e}")
@@ -586,6 +633,9 @@ def main():
     """Start the bot."""
     logger.info("Starting bot...")
 
+    # Exit normally on SIGTERM (systemd/docker stop) so pending community data is flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     # Get bot info
     response = requests.get(f"{API_URL}/getMe")
     bot_info = response.json()
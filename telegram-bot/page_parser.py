@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Page Parser
+Extracts the price fields from the coin page with a selectable HTML parser backend
+
+Backends, set with PARSER_BACKEND:
+    selectolax   - lexbor via selectolax (pip install selectolax)
+    lxml         - libxml2 via lxml (pip install lxml)
+    stream       - streaming tokenizer on the standard library's HTMLParser; builds no tree
+    html.parser  - BeautifulSoup with its pure-Python html.parser builder
+    auto         - the first of selectolax, lxml and stream that is installed (default)
+
+Every backend applies the same rules as price_tracker's original extractors:
+the price is the text of the first div whose class contains "price", and
+each other field is the text of the element holding the first string that
+contains its label, with the label removed.
+"""
+
+import os
+import logging
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup, NavigableString
+from dotenv import load_dotenv
+
+try:
+    from lxml import etree
+    import lxml.html as lxml_html
+except ImportError:  # lxml is optional
+    etree = None
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax is optional
+    LexborHTMLParser = None
+
+# Load environment variables
+load_dotenv()
+
+# Enable logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "auto")
+AUTO_BACKENDS = ("selectolax", "lxml", "stream")  # Tried in order by 'auto'
+# Stats found by their text label: field -> (lowercase text to look for, label removed from the value)
+PAGE_LABELS = {
+    "market_cap": ("market cap", "Market Cap:"),
+    "holders": ("holders", "Holders:"),
+    "volume_24h": ("volume", "Volume (24h):"),
+    "price_change_24h": ("change", "Change (24h):")
+}
+PRICE_FIELDS = ("price",) + tuple(PAGE_LABELS)
+STREAM_CHUNK_SIZE = 16384  # Characters fed to the streaming parser between checks for completion
+# Elements that never have content or an end tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"
+}
+
+class FieldCollector:
+    """
+    Collects the price fields as a backend reports strings and elements in document order.
+    
+    Backends call is_price_element() for each element and match_text() for each
+    string; the first match of each field wins, and finished turns True once
+    every field has been found so the backend can stop early.
+    """
+    
+    def __init__(self):
+        """Initialize with every field still to find."""
+        self.fields = {}
+        self.pending = dict(PAGE_LABELS)
+    
+    @property
+    def finished(self):
+        """Whether every field has been found."""
+        return "price" in self.fields and not self.pending
+    
+    def is_price_element(self, tag, classes):
+        """
+        Check whether an element holds the price.
+        
+        Args:
+            tag (str): Element name
+            classes (str): Value of the class attribute
+        
+        Returns:
+            bool: True for the first div whose class contains "price"
+        """
+        return "price" not in self.fields and tag == "div" and "price" in (classes or "")
+    
+    def match_text(self, text):
+        """
+        Find the fields whose label occurs in a string.
+        
+        Args:
+            text (str): A string from the page
+        
+        Returns:
+            list: (field, label) pairs, now no longer pending
+        """
+        if not self.pending or not text:
+            return []
+        lowered = text.lower()
+        matched = [(field, label) for field, (needle, label) in self.pending.items() if needle in lowered]
+        for field, _ in matched:
+            del self.pending[field]
+        return matched
+    
+    def set_labelled(self, matched, parent_text):
+        """Set fields matched by match_text() from the text of the string's parent element."""
+        for field, label in matched:
+            self.fields[field] = parent_text.replace(label, '').strip()
+    
+    def result(self):
+        """
+        Get the fields found.
+        
+        Returns:
+            dict: Display strings for each price field, "N/A" where not found
+        """
+        return {field: self.fields.get(field, "N/A") for field in PRICE_FIELDS}
+
+def extract_all(soup):
+    """
+    Extract every price field from a BeautifulSoup object in a single walk.
+    
+    Gives the same results as price_tracker's extract_* functions, which each
+    walk the document from the top, but visits each node at most once and stops
+    as soon as every field has been found.
+    
+    Args:
+        soup (BeautifulSoup): Parsed coin page
+    
+    Returns:
+        dict: Display strings for each price field, "N/A" where not found
+    """
+    # Note: Like the extract_* functions, this will need adjusting to the actual HTML of pump.fun
+    collector = FieldCollector()
+    
+    try:
+        for node in soup.descendants:
+            if isinstance(node, NavigableString):
+                matched = collector.match_text(node)
+                if matched:
+                    # The label's parent element holds the value
+                    collector.set_labelled(matched, node.parent.text)
+            elif collector.is_price_element(node.name, " ".join(node.get("class", ()))):
+                collector.fields["price"] = node.text.strip()
+            
+            if collector.finished:
+                break
+    except Exception as e:
+        logger.error(f"Error extracting price fields: {e}")
+    
+    return collector.result()
+
+def _parse_html_parser(html):
+    """Extract the fields with BeautifulSoup's html.parser builder."""
+    return extract_all(BeautifulSoup(html, 'html.parser'))
+
+def _parse_lxml(html):
+    """Extract the fields from an lxml tree, walking start and end events in document order."""
+    collector = FieldCollector()
+    root = lxml_html.document_fromstring(html)
+    
+    for event, element in etree.iterwalk(root, events=("start", "end", "comment")):
+        if event == "start":
+            if collector.is_price_element(element.tag, element.get("class")):
+                collector.fields["price"] = element.text_content().strip()
+            matched = collector.match_text(element.text)
+            if matched:
+                collector.set_labelled(matched, element.text_content())
+        else:
+            # A comment is a string in its parent, and text after an end tag or comment belongs to the parent
+            parent = element.getparent()
+            if parent is not None:
+                matched = collector.match_text(element.text) if event == "comment" else []
+                matched += collector.match_text(element.tail)
+                if matched:
+                    collector.set_labelled(matched, parent.text_content())
+        
+        if collector.finished:
+            break
+    
+    return collector.result()
+
+def _parse_selectolax(html):
+    """Extract the fields from a lexbor tree via selectolax."""
+    collector = FieldCollector()
+    tree = LexborHTMLParser(html)
+    
+    for node in tree.root.traverse(include_text=True):
+        if node.tag == "-text":
+            matched = collector.match_text(node.text_content)
+        elif node.tag == "-comment":
+            matched = collector.match_text(node.comment_content)
+        else:
+            if collector.is_price_element(node.tag, node.attributes.get("class")):
+                collector.fields["price"] = node.text(deep=True).strip()
+            matched = []
+        if matched:
+            collector.set_labelled(matched, node.parent.text(deep=True))
+        
+        if collector.finished:
+            break
+    
+    return collector.result()
+
+class StreamingFieldParser(HTMLParser):
+    """
+    Extracts the price fields while the page is fed in, without building a tree.
+    
+    Only the open elements are tracked, each with where its text starts, so an
+    element's text is known when it closes. Feed chunks with feed() and stop as
+    soon as finished is True; otherwise close() at the end of the page settles
+    any fields still waiting for their element to end. Fields still waiting when
+    the page is cut off without close() are reported as "N/A".
+    """
+    
+    def __init__(self):
+        """Initialize the parser."""
+        super().__init__(convert_charrefs=True)
+        self.collector = FieldCollector()
+        self.chunks = []  # Text seen so far
+        self.text_start = None  # Index of the first chunk of the string being read, if any
+        # Open elements as [tag, index of their first text chunk, (field, label) pairs set when they close];
+        # the document itself is the bottom entry
+        self.stack = [[None, 0, []]]
+    
+    @property
+    def finished(self):
+        """Whether every field has been found, and its element has closed so its value is known."""
+        return self.collector.finished and all(value is not None for value in self.collector.fields.values())
+    
+    def handle_starttag(self, tag, attrs):
+        self._end_text()
+        if tag in VOID_ELEMENTS:
+            return
+        captures = []
+        if self.collector.is_price_element(tag, dict(attrs).get("class")):
+            # Reserve the field so later divs are skipped; its text is known when the div closes
+            self.collector.fields["price"] = None
+            captures.append(("price", ""))
+        self.stack.append([tag, len(self.chunks), captures])
+    
+    def handle_endtag(self, tag):
+        self._end_text()
+        # Like a browser, an end tag also closes any elements left open inside it
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth][0] == tag:
+                while len(self.stack) > depth:
+                    self._close(self.stack.pop())
+                return
+    
+    def handle_data(self, data):
+        # A string arrives in pieces when it spans fed chunks, so it is matched once it ends
+        if self.text_start is None:
+            self.text_start = len(self.chunks)
+        self.chunks.append(data)
+    
+    def handle_comment(self, data):
+        self._end_text()
+        self._match(data)
+    
+    def handle_decl(self, decl):
+        self._end_text()
+    
+    def handle_pi(self, data):
+        self._end_text()
+    
+    def _end_text(self):
+        """Match the string read since the last tag, now that it is complete."""
+        if self.text_start is not None:
+            self._match("".join(self.chunks[self.text_start:]))
+            self.text_start = None
+    
+    def _match(self, text):
+        """Attach fields whose label occurs in a string to the element the string is in."""
+        for field, label in self.collector.match_text(text):
+            self.collector.fields[field] = None
+            self.stack[-1][2].append((field, label))
+    
+    def _close(self, element):
+        """Set the fields waiting for an element from its text."""
+        _, start, captures = element
+        if captures:
+            text = "".join(self.chunks[start:])
+            for field, label in captures:
+                self.collector.fields[field] = text.replace(label, '').strip() if label else text.strip()
+    
+    def close(self):
+        """Finish parsing and settle fields whose elements never closed."""
+        super().close()
+        self._end_text()
+        while self.stack:
+            self._close(self.stack.pop())
+    
+    def result(self):
+        """
+        Get the fields found.
+        
+        Returns:
+            dict: Display strings for each price field, "N/A" where not found
+        """
+        return {
+            field: value if value is not None else "N/A"
+            for field, value in self.collector.result().items()
+        }
+
+def _parse_stream(html):
+    """Extract the fields with the streaming parser, stopping once all are known."""
+    parser = StreamingFieldParser()
+    for start in range(0, len(html), STREAM_CHUNK_SIZE):
+        parser.feed(html[start:start + STREAM_CHUNK_SIZE])
+        if parser.finished:
+            break
+    else:
+        parser.close()
+    return parser.result()
+
+BACKENDS = {
+    "selectolax": (_parse_selectolax, LexborHTMLParser is not None),
+    "lxml": (_parse_lxml, lxml_html is not None),
+    "stream": (_parse_stream, True),
+    "html.parser": (_parse_html_parser, True)
+}
+
+def available_backends():
+    """
+    List the backends that can run here.
+    
+    Returns:
+        list: Backend names
+    """
+    return [name for name, (_, available) in BACKENDS.items() if available]
+
+def resolve_backend(name=None):
+    """
+    Pick the backend to use, falling back when the requested one is not installed.
+    
+    Args:
+        name (str, optional): Backend name or 'auto'. Defaults to PARSER_BACKEND.
+    
+    Returns:
+        str: Name of an available backend
+    """
+    name = name or PARSER_BACKEND
+    if name != "auto":
+        if name in BACKENDS and BACKENDS[name][1]:
+            return name
+        logger.warning(f"Parser backend {name} is not available, falling back")
+    return next(backend for backend in AUTO_BACKENDS if BACKENDS[backend][1])
+
+def parse_fields(html, backend=None):
+    """
+    Extract the price fields from the coin page HTML.
+    
+    Args:
+        html (str): Page HTML
+        backend (str, optional): Backend name. Defaults to PARSER_BACKEND.
+    
+    Returns:
+        dict: Display strings for each price field, "N/A" where not found
+    """
+    return BACKENDS[resolve_backend(backend)][0](html)
+
+def make_soup(html):
+    """
+    Build a BeautifulSoup tree, with the lxml builder when lxml is installed and allowed.
+    
+    Args:
+        html (str): Page HTML
+    
+    Returns:
+        BeautifulSoup: Parsed page
+    """
+    features = 'lxml' if lxml_html is not None and PARSER_BACKEND != "html.parser" else 'html.parser'
+    return BeautifulSoup(html, features)
+
+if __name__ == "__main__":
+    # Test each backend on the sample page
+    sample = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pump_fun_coin.html")
+    with open(sample, 'r', encoding='utf-8') as f:
+        page = f.read()
+    
+    for backend in available_backends():
+        print(f"{backend}: {parse_fields(page, backend)}")
@@ -8,9 +8,11 @@ Fetches price data from pump.fun
 
 import os
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+from page_parser import make_soup
+from price_sources import session
+
 # Load environment variables
 load_dotenv()
 
@@ -28,10 +30,10 @@ def fetch_price_data():
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(PUMP_FUN_URL, headers=headers, timeout=10)
+        response = session.get(PUMP_FUN_URL, headers=headers, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
         
         # Note: These selectors will need to be updated based on the actual HTML structure of pump.fun
         # This is just a placeholder implementation
@@ -0,0 +1,458 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Price Sources
+Upstream sources for price data: the pump.fun coin page or a JSON API
+"""
+
+import os
+import json
+import codecs
+import time
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Enable logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+PRICE_SOURCE = os.getenv("PRICE_SOURCE", "html")  # 'html' or 'json'
+PRICE_PAGE_URL = os.getenv("PRICE_PAGE_URL", "https://pump.fun/coin/{address}")
+PRICE_PAGE_MODE = os.getenv("PRICE_PAGE_MODE", "stream")  # 'stream' or 'full'
+PRICE_STREAM_MAX_BYTES = int(os.getenv("PRICE_STREAM_MAX_BYTES", str(2 * 1024 * 1024)))  # Stop reading the page here
+# After an early exit, read out the rest of the page unparsed if at most this many bytes are left on the wire,
+# so the connection can be reused; 0 always drops the connection instead
+PRICE_STREAM_DRAIN_BYTES = int(os.getenv("PRICE_STREAM_DRAIN_BYTES", str(256 * 1024)))
+PRICE_API_URL = os.getenv("PRICE_API_URL", "https://api.dexscreener.com/latest/dex/tokens/{address}")
+# Price field -> dotted path into the API response (list items by index)
+DEFAULT_API_FIELDS = {
+    "price": "pairs.0.priceUsd",
+    "market_cap": "pairs.0.marketCap",
+    "volume_24h": "pairs.0.volume.h24",
+    "price_change_24h": "pairs.0.priceChange.h24"
+}
+PRICE_API_FIELDS = json.loads(os.getenv("PRICE_API_FIELDS", "null")) or DEFAULT_API_FIELDS
+PRICE_FIELDS = ("price", "market_cap", "holders", "volume_24h", "price_change_24h")
+REQUEST_TIMEOUT = 10  # seconds
+STREAM_CHUNK_SIZE = 16384  # Bytes read between checks for whether every field has been found
+PRICE_POOL_SIZE = int(os.getenv("PRICE_POOL_SIZE", "4"))  # Keep-alive connections kept per upstream host
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+class CountingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that counts the connections it opens.
+    
+    urllib3 reopens a dropped keep-alive connection in place, e.g. after a
+    streamed response was closed unread, so connections are counted as they
+    connect rather than as the pool creates them.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        self.connections_opened = 0
+        super().__init__(*args, **kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+        
+        def counting(pool_class):
+            class CountingConnection(pool_class.ConnectionCls):
+                def connect(self):
+                    adapter.connections_opened += 1
+                    super().connect()
+            return type(pool_class.__name__, (pool_class,), {"ConnectionCls": CountingConnection})
+        
+        # The pool class mapping is shared by default, so replace it rather than editing it
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: counting(pool_class) for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+def create_session(pool_size=PRICE_POOL_SIZE):
+    """
+    Create a session that keeps connections alive between polls.
+    
+    Responses are requested compressed: gzip and deflate always, and brotli
+    when the brotli package is installed, since urllib3 only offers the
+    encodings it can decode.
+    
+    Args:
+        pool_size (int): Connections kept open per host
+    
+    Returns:
+        requests.Session: The session
+    """
+    session = requests.Session()
+    adapter = CountingAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return session
+
+# Shared by every price source, so polls reuse connections instead of handshaking each time
+session = create_session()
+
+class PriceSource:
+    """
+    Base class for price sources.
+    
+    Subclasses set name and headers and implement parse(). Requests go through
+    the shared session. Once a response has been parsed, its ETag and
+    Last-Modified are sent back on the next poll, and a 304 Not Modified
+    answer returns the previous fields without downloading or parsing the
+    body again.
+    
+    Every poll is counted in stats: bytes is the decoded body size parsed and
+    wire_bytes what was read from the network. bytes_saved_compression counts
+    what compression saved on bodies read to the end, and
+    bytes_saved_not_modified what 304 answers saved. connections_opened and connections_reused count whether each
+    request needed a new connection.
+    """
+    
+    name = None
+    headers = {'User-Agent': USER_AGENT}
+    
+    def __init__(self, url, conditional=True):
+        """
+        Initialize the source.
+        
+        Args:
+            url (str): URL polled for price data
+            conditional (bool): Send ETag/Last-Modified validators so unchanged data comes back as 304
+        """
+        self.url = url
+        self.label = urlparse(url).netloc  # Shown as "Data from ..." in price messages
+        self.conditional = conditional
+        self.validators = {}  # Conditional request headers from the last parsed response
+        self.last_fields = None
+        self.last_wire_bytes = 0
+        self.stats = {
+            "polls": 0,
+            "bytes": 0,
+            "wire_bytes": 0,
+            "parse_seconds": 0.0,
+            "not_modified": 0,
+            "bytes_saved_compression": 0,
+            "bytes_saved_not_modified": 0,
+            "connections_opened": 0,
+            "connections_reused": 0
+        }
+    
+    def request(self, stream=False):
+        """
+        Send a GET through the shared session, conditional if a previous response can be reused.
+        
+        Args:
+            stream (bool): Leave the body unread, for iter_content()
+        
+        Returns:
+            requests.Response: The response
+        """
+        headers = dict(self.headers)
+        if self.conditional and self.last_fields is not None:
+            headers.update(self.validators)
+        
+        adapter = session.get_adapter(self.url)
+        opened = adapter.connections_opened
+        response = session.get(self.url, headers=headers, timeout=REQUEST_TIMEOUT, stream=stream)
+        if adapter.connections_opened > opened:
+            self.stats["connections_opened"] += 1
+        else:
+            self.stats["connections_reused"] += 1
+        return response
+    
+    def not_modified(self, response):
+        """
+        Count a 304 answer.
+        
+        Args:
+            response (requests.Response): The 304 response
+        
+        Returns:
+            dict: The fields from the last parsed response
+        """
+        response.content  # Consume the empty body, or closing a streamed response drops its connection
+        self.stats["polls"] += 1
+        self.stats["not_modified"] += 1
+        self.stats["bytes_saved_not_modified"] += self.last_wire_bytes
+        return dict(self.last_fields)
+    
+    def remember(self, response, fields, received, parse_seconds, decoded=None):
+        """
+        Count a parsed response and keep its fields and validators for the next poll.
+        
+        Args:
+            response (requests.Response): The response, before it is closed
+            fields (dict): Fields parsed from it
+            received (int): Decoded body bytes parsed
+            parse_seconds (float): Time spent parsing
+            decoded (int, optional): Decoded size of the whole body, if it was read to the end.
+                Compression savings are only counted then: after an early exit, urllib3 has read
+                ahead on the wire by an amount that does not match the decoded bytes handed out.
+        
+        Returns:
+            dict: The fields
+        """
+        wire_bytes = response.raw.tell()  # Bytes read from the connection, before decompression
+        self.stats["polls"] += 1
+        self.stats["bytes"] += received
+        self.stats["wire_bytes"] += wire_bytes
+        if decoded is not None:
+            self.stats["bytes_saved_compression"] += max(0, decoded - wire_bytes)
+        self.stats["parse_seconds"] += parse_seconds
+        
+        self.validators = {}
+        if response.headers.get("ETag"):
+            self.validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            self.validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        self.last_fields = dict(fields)
+        self.last_wire_bytes = wire_bytes
+        return fields
+    
+    def fetch(self):
+        """
+        Download and parse the current price data.
+        
+        Returns:
+            dict: Display strings for each of PRICE_FIELDS, "N/A" where unknown
+        
+        Raises:
+            requests.RequestException: If the download fails
+            ValueError: If the response cannot be parsed
+        """
+        with self.request() as response:
+            if response.status_code == 304:
+                return self.not_modified(response)
+            response.raise_for_status()
+            
+            started = time.perf_counter()
+            fields = self.parse(response.content)
+            size = len(response.content)
+            return self.remember(response, fields, size, time.perf_counter() - started, decoded=size)
+    
+    def parse(self, content):
+        """
+        Parse a response body.
+        
+        Args:
+            content (bytes): Response body
+        
+        Returns:
+            dict: Display strings for each of PRICE_FIELDS
+        """
+        raise NotImplementedError
+
+class HTMLPriceSource(PriceSource):
+    """
+    Scrapes the fields from the pump.fun coin page.
+    
+    With a stream parser, the page is read in chunks and fed to the parser as
+    it arrives, and parsing stops as soon as every field has been found.
+    Reading also stops at max_bytes in case the fields never turn up.
+    
+    A keep-alive connection can only be reused once its response has been
+    read to the end. So after an early exit, the rest of the page is read
+    without parsing if no more than drain_bytes are left on the wire;
+    otherwise the connection is dropped and the rest is never downloaded.
+    This trades bandwidth for connection reuse: the default favours reuse for
+    pages of a few hundred KB, and drain_bytes=0 favours bandwidth.
+    """
+    
+    name = "HTML"
+    
+    def __init__(self, url, extract, stream_parser=None, max_bytes=PRICE_STREAM_MAX_BYTES,
+                 drain_bytes=PRICE_STREAM_DRAIN_BYTES, conditional=True):
+        """
+        Initialize the source.
+        
+        Args:
+            url (str): Coin page URL
+            extract (callable): Takes the page HTML and returns the price fields
+            stream_parser (callable, optional): Creates an incremental parser with feed(), close(),
+                finished and result(). Without one, the whole page is downloaded and passed to extract.
+            max_bytes (int): Most bytes read from a page when streaming
+            drain_bytes (int): Most bytes left on the wire that are read out after an early exit to keep the connection
+            conditional (bool): Send ETag/Last-Modified validators so an unchanged page comes back as 304
+        """
+        super().__init__(url, conditional)
+        self.extract = extract
+        self.stream_parser = stream_parser
+        self.max_bytes = max_bytes
+        self.drain_bytes = drain_bytes
+        self.stats.update({"early_exits": 0, "truncated": 0, "drained": 0, "connections_dropped": 0})
+    
+    def fetch(self):
+        if self.stream_parser is None:
+            return super().fetch()
+        
+        parser = self.stream_parser()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        received = 0
+        decoded = None  # Size of the whole body, once read to the end
+        parse_seconds = 0.0
+        with self.request(stream=True) as response:
+            if response.status_code == 304:
+                return self.not_modified(response)
+            response.raise_for_status()
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            for chunk in chunks:
+                received += len(chunk)
+                started = time.perf_counter()
+                parser.feed(decoder.decode(chunk))
+                parse_seconds += time.perf_counter() - started
+                if parser.finished:
+                    self.stats["early_exits"] += 1
+                    drained = self.drain(response, chunks)
+                    if drained is not None:
+                        self.stats["drained"] += 1
+                        decoded = received + drained
+                    else:
+                        # Leaving the with block closes the connection with the rest of the page unread
+                        self.stats["connections_dropped"] += 1
+                    break
+                if received >= self.max_bytes:
+                    logger.warning(f"Stopped reading {self.url} after {received} bytes without finding every field")
+                    self.stats["truncated"] += 1
+                    break
+            else:
+                started = time.perf_counter()
+                parser.feed(decoder.decode(b'', final=True))
+                parser.close()
+                parse_seconds += time.perf_counter() - started
+                decoded = received
+            
+            return self.remember(response, parser.result(), received, parse_seconds, decoded)
+    
+    def drain(self, response, chunks):
+        """
+        Read out the rest of a streamed page if little is left, so its connection goes back to the pool.
+        
+        Args:
+            response (requests.Response): The streamed response
+            chunks (iterator): Its iter_content() iterator, partly consumed
+        
+        Returns:
+            int: Decoded bytes read out, or None if the rest was left unread
+        """
+        if self.drain_bytes <= 0:
+            return None
+        start = response.raw.tell()
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) - start > self.drain_bytes:
+            return None
+        
+        drained = 0
+        for chunk in chunks:
+            drained += len(chunk)
+            # Without a Content-Length the size is only known by reading; give up once over the limit
+            if response.raw.tell() - start > self.drain_bytes:
+                return None
+        return drained
+    
+    def parse(self, content):
+        return self.extract(content.decode('utf-8', errors='replace'))
+
+class JSONPriceSource(PriceSource):
+    """
+    Reads the fields from a JSON price API.
+    
+    Only the configured paths are looked up; any field without a path, or
+    missing from the response, is reported as "N/A".
+    """
+    
+    name = "JSON"
+    headers = {'User-Agent': USER_AGENT, 'Accept': 'application/json'}
+    
+    def __init__(self, url, fields=None, conditional=True):
+        """
+        Initialize the source.
+        
+        Args:
+            url (str): API URL
+            fields (dict, optional): Price field -> dotted path. Defaults to PRICE_API_FIELDS.
+            conditional (bool): Send ETag/Last-Modified validators so an unchanged response comes back as 304
+        """
+        super().__init__(url, conditional)
+        self.fields = fields or PRICE_API_FIELDS
+    
+    def parse(self, content):
+        data = json.loads(content)
+        return {
+            field: format_field(field, lookup(data, self.fields[field]) if field in self.fields else None)
+            for field in PRICE_FIELDS
+        }
+
+def lookup(data, path):
+    """
+    Look up a dotted path such as "pairs.0.priceUsd" in parsed JSON.
+    
+    Returns:
+        The value, or None if any step is missing
+    """
+    for key in path.split("."):
+        if isinstance(data, list):
+            if not key.isdigit() or int(key) >= len(data):
+                return None
+            data = data[int(key)]
+        elif isinstance(data, dict):
+            data = data.get(key)
+        else:
+            return None
+    return data
+
+def format_field(field, value):
+    """
+    Format an API value the way the price messages show it.
+    
+    Args:
+        field (str): One of PRICE_FIELDS
+        value: Number or numeric string from the API, or None
+    
+    Returns:
+        str: Display string; the price stays a plain number so alerts can parse it
+    """
+    if value is None:
+        return "N/A"
+    if field == "price":
+        return str(value)
+    if field in ("market_cap", "volume_24h"):
+        return f"${float(value):,.0f}"
+    if field == "holders":
+        return f"{int(value):,}"
+    return f"{float(value):+.1f}%"
+
+def create_price_source(coin_address, extract_html, name=None, stream_parser=None):
+    """
+    Create the configured price source.
+    
+    Args:
+        coin_address (str): Token address substituted into the URL
+        extract_html (callable): HTML extractor for the 'html' source
+        name (str, optional): 'html' or 'json'. Defaults to PRICE_SOURCE.
+        stream_parser (callable, optional): Incremental parser for the 'html' source, used when PRICE_PAGE_MODE is 'stream'
+    
+    Returns:
+        PriceSource: The source
+    """
+    name = name or PRICE_SOURCE
+    if name == "json":
+        return JSONPriceSource(PRICE_API_URL.format(address=coin_address))
+    if name != "html":
+        logger.warning(f"Unknown price source {name}, using html")
+    if PRICE_PAGE_MODE not in ("stream", "full"):
+        logger.warning(f"Unknown page mode {PRICE_PAGE_MODE}, reading the whole page")
+    streaming = PRICE_PAGE_MODE == "stream" and stream_parser is not None
+    return HTMLPriceSource(
+        PRICE_PAGE_URL.format(address=coin_address), extract_html, stream_parser if streaming else None
+    )
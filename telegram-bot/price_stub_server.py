@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Price Stub Server
+Serves the recorded price fixtures so the price sources can be run offline
+
+Usage:
+    python price_stub_server.py [--port 8765]
+
+Then point the bot or price_tracker.py at it, e.g.:
+    
+    PRICE_SOURCE=json PRICE_API_URL=http://127.0.0.1:8765/latest/dex/tokens/{address} python price_tracker.py
+    PRICE_SOURCE=html PRICE_PAGE_URL=http://127.0.0.1:8765/coin/{address} python price_tracker.py
+
+Any coin address is accepted. The coin page is the full-size sample page that
+sample_pages.py builds from fixtures/pump_fun_coin.html. Fixtures are read from
+the fixtures directory on every request, so they can be edited while the server
+runs. Like a real upstream, responses carry an ETag and Last-Modified,
+conditional requests for an unchanged fixture get 304 Not Modified, and bodies
+are gzipped for clients that accept it.
+"""
+
+import os
+import sys
+import gzip
+import zlib
+import argparse
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sample_pages import SAMPLE_FIXTURE, SAMPLE_PAGES, sample_page
+
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Path prefix -> (fixture file or sample page name, content type)
+ROUTES = {
+    "/coin/": ("pump_fun_coin_padded", "text/html; charset=utf-8"),
+    "/latest/dex/tokens/": ("dexscreener_tokens.json", "application/json")
+}
+
+# Sample page name -> (modification time of the fixture it was built from, page)
+sample_page_cache = {}
+
+def read_fixture(fixture):
+    """
+    Read a fixture, or build a sample page, rebuilding it only when its fixture changes.
+    
+    Args:
+        fixture (str): Fixture file name, or one of the sample page names
+    
+    Returns:
+        tuple: (body, modification time of the file it came from)
+    """
+    if fixture in SAMPLE_PAGES:
+        modified = os.path.getmtime(SAMPLE_FIXTURE)
+        cached = sample_page_cache.get(fixture)
+        if cached is None or cached[0] != modified:
+            cached = sample_page_cache[fixture] = (modified, sample_page(fixture).encode('utf-8'))
+        return cached[1], modified
+    
+    path = os.path.join(FIXTURES_DIRECTORY, fixture)
+    with open(path, 'rb') as f:
+        return f.read(), os.path.getmtime(path)
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers GET requests with the fixture for the path."""
+    
+    protocol_version = "HTTP/1.1"  # Keep connections alive between requests
+    disable_nagle_algorithm = True  # Headers and body are separate writes; don't let the body wait for an ACK
+    
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # A streaming client hung up once it had what it needed
+    
+    def do_GET(self):
+        for prefix, (fixture, content_type) in ROUTES.items():
+            if self.path.startswith(prefix):
+                body, modified = read_fixture(fixture)
+                etag = f'"{zlib.crc32(body):08x}"'
+                last_modified = formatdate(modified, usegmt=True)
+                
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", last_modified)
+                    self.end_headers()
+                    return
+                
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=6)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+    
+    def log_message(self, format, *args):
+        """Keep request logs out of benchmark output."""
+        pass
+
+def start_stub_server(port=0):
+    """
+    Start the stub server in a background thread.
+    
+    Args:
+        port (int): Port to listen on, or 0 for any free port
+    
+    Returns:
+        tuple: (server, base URL)
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def main():
+    """Run the stub server until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve recorded NeonX price fixtures")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler)
+    print(f"Serving fixtures on http://127.0.0.1:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,16 +3,18 @@
 
 """
 NeonX Price Tracker
-Fetches and processes price data for the NeonX token from pump.fun
+Fetches and processes price data for the NeonX token from pump.fun or a JSON price API
 """
 
 import os
 import time
 import logging
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+from price_sources import create_price_source
+from page_parser import StreamingFieldParser, parse_fields
+
 # Load environment variables
 load_dotenv()
 
@@ -34,12 +36,16 @@ price_cache = {
     "volume_24h": "N/A",
     "price_change_24h": "N/A",
     "last_updated": 0,
-    "cache_duration": 300  # 5 minutes in seconds
+    "cache_duration": 300,  # 5 minutes in seconds
+    "version": 0  # Bumped whenever the cached data changes
 }
 
+# Rendered price messages keyed by name, with the cache version (and fetch time) they were rendered from
+rendered_messages = {}
+
 def fetch_price_data(force_refresh=False):
     """
-    Fetch price data from pump.fun
+    Fetch price data from the configured price source
     
     Args:
         force_refresh (bool): Force refresh the cache even if it's not expired
@@ -54,66 +60,45 @@ def fetch_price_data(force_refresh=False):
         return price_cache
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(PUMP_FUN_URL, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract data from the page
-        # Note: These selectors will need to be adjusted based on the actual HTML structure
-        try:
-            # This is a placeholder implementation - you'll need to inspect the actual HTML
-            # of pump.fun to find the correct selectors for these values
-            
-            # Try to find price
-            price = extract_price(soup)
-            
-            # Try to find market cap
-            market_cap = extract_market_cap(soup)
-            
-            # Try to find holders count
-            holders = extract_holders(soup)
-            
-            # Try to find 24h volume
-            volume_24h = extract_volume(soup)
-            
-            # Try to find 24h price change
-            price_change_24h = extract_price_change(soup)
-            
-            # Update cache
-            price_cache.update({
-                "price": price,
-                "market_cap": market_cap,
-                "holders": holders,
-                "volume_24h": volume_24h,
-                "price_change_24h": price_change_24h,
-                "last_updated": current_time,
-                "success": True,
-                "error": None
-            })
-            
-            return price_cache
-            
-        except Exception as e:
-            logger.error(f"Error parsing HTML: {e}")
-            price_cache.update({
-                "last_updated": current_time,
-                "success": False,
-                "error": f"Error parsing HTML: {str(e)}"
-            })
-            return price_cache
-            
+        fields = price_source.fetch()
     except requests.RequestException as e:
         logger.error(f"Request error: {e}")
-        price_cache.update({
-            "last_updated": current_time,
-            "success": False,
-            "error": f"Request error: {str(e)}"
-        })
-        return price_cache
+        return _update_cache({"success": False, "error": f"Request error: {str(e)}"}, current_time)
+    except Exception as e:
+        logger.error(f"Error parsing {price_source.name}: {e}")
+        return _update_cache({"success": False, "error": f"Error parsing {price_source.name}: {str(e)}"}, current_time)
+    
+    # Update cache
+    return _update_cache(dict(fields, success=True, error=None), current_time)
+
+def _update_cache(values, current_time):
+    """
+    Store a fetch's result in the price cache, bumping the version only if the data changed.
+    
+    Args:
+        values (dict): Fields, success and error to store
+        current_time (float): Time of the fetch
+    
+    Returns:
+        dict: The price cache
+    """
+    if any(price_cache.get(key) != value for key, value in values.items()):
+        price_cache.update(values)
+        price_cache["version"] += 1
+    price_cache["last_updated"] = current_time
+    return price_cache
+
+def extract_fields(html):
+    """
+    Extract all price fields from the coin page HTML with the configured parser backend.
+    
+    Args:
+        html (str): Page HTML
+    
+    Returns:
+        dict: Display strings for each price field
+    """
+    return parse_fields(html)
 
 def extract_price(soup):
     """Extract price from the soup object."""
@@ -183,11 +168,48 @@ def extract_price_change(soup):
     except Exception:
         return "N/A"
 
+# Where price data comes from; set PRICE_SOURCE=json to use a JSON price API instead of the coin page.
+# The coin page is streamed and only read up to the last field unless PRICE_PAGE_MODE=full.
+price_source = create_price_source(COIN_ADDRESS, extract_fields, stream_parser=StreamingFieldParser)
+
+def render_cached(name, render, timestamped=False):
+    """
+    Render a message from the price data, reusing the last rendering while the data is unchanged.
+    
+    Args:
+        name (str): Cache key for the message
+        render (callable): Builds the message from the price data
+        timestamped (bool): Whether the message shows when the data was last fetched,
+            so it must also be rendered again after every fetch
+    
+    Returns:
+        str: Rendered message
+    """
+    data = fetch_price_data()
+    key = (data["version"], data["last_updated"] if timestamped else None)
+    cached = rendered_messages.get(name)
+    if cached and cached[0] == key:
+        return cached[1]
+    
+    message = render(data)
+    rendered_messages[name] = (key, message)
+    return message
+
 def get_formatted_price_message():
     """Get a formatted message with price data."""
-    data = fetch_price_data()
+    return render_cached("price", format_price_message, timestamped=True)
+
+def get_price_summary_message():
+    """
+    Get a short price summary for the community stats message.
     
-    # Format the message
+    Returns:
+        str: Formatted summary, or an empty string if no price data is available
+    """
+    return render_cached("summary", format_price_summary)
+
+def format_price_message(data):
+    """Format the full price message from price data."""
     if data.get("success", False) or data.get("price") != "N/A":
         message = (
             "💰 *NeonX Price Information* 💰\n\n"
@@ -196,7 +218,7 @@ def get_formatted_price_message():
             f"*Holders:* {data['holders']}\n"
             f"*Volume (24h):* {data['volume_24h']}\n"
             f"*Price Change (24h):* {data['price_change_24h']}\n\n"
-            f"Data from pump.fun\n"
+            f"Data from {price_source.label}\n"
             f"Last updated: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data['last_updated']))}"
         )
     else:
@@ -209,6 +231,17 @@ def get_formatted_price_message():
     
     return message
 
+def format_price_summary(data):
+    """Format the price summary for the community stats message from price data."""
+    if data.get("success", False) or data.get("price") != "N/A":
+        return (
+            "💰 *Current Price Information* 💰\n"
+            f"*Price:* {data['price']}\n"
+            f"*Market Cap:* {data['market_cap']}\n"
+            f"*Holders:* {data['holders']}"
+        )
+    return ""
+
 if __name__ == "__main__":
     # Test the function
     print("Fetching price data for NeonX...")
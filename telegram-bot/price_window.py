@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Price Window
+Rolling-window price changes over a ring buffer of price ticks
+"""
+
+from bisect import bisect_right
+from collections import deque
+
+class PriceWindow:
+    """
+    Fixed-size ring buffer of price ticks with windowed min/max.
+    
+    Each window keeps a monotonic deque of tick sequence numbers for its minimum
+    and maximum price, so pushing a tick and reading a window's change are
+    amortized O(1) per window instead of a rescan of the history.
+    
+    Ticks older than the latest one, e.g. from a backfill, are inserted in
+    order by rebuilding the buffer, and change() can be read as of such a
+    tick by scanning the history; both are O(capacity) but only happen for
+    late ticks.
+    """
+    
+    def __init__(self, windows, capacity=4096):
+        """
+        Initialize the price window.
+        
+        Args:
+            windows (iterable): Window lengths in seconds
+            capacity (int): Number of ticks kept; longer windows are clipped to it
+        """
+        self.capacity = capacity
+        self.timestamps = [0.0] * capacity
+        self.prices = [0.0] * capacity
+        self.count = 0  # Sequence number of the next tick
+        self.min_ticks = {window: deque() for window in windows}
+        self.max_ticks = {window: deque() for window in windows}
+    
+    def _price(self, seq):
+        """Return the price of a tick by sequence number."""
+        return self.prices[seq % self.capacity]
+    
+    def latest(self):
+        """
+        Return the most recent tick.
+        
+        Returns:
+            tuple: (timestamp, price), or None if no tick has been pushed
+        """
+        if not self.count:
+            return None
+        slot = (self.count - 1) % self.capacity
+        return self.timestamps[slot], self.prices[slot]
+    
+    def ticks(self):
+        """
+        Return the kept ticks.
+        
+        Returns:
+            list: (timestamp, price) tuples, oldest first
+        """
+        first = max(0, self.count - self.capacity)
+        return [(self.timestamps[seq % self.capacity], self._price(seq)) for seq in range(first, self.count)]
+    
+    def push(self, timestamp, price):
+        """
+        Add a price tick.
+        
+        A tick older than the latest one is inserted in timestamp order, after
+        any ticks with the same timestamp; one older than the whole buffer is
+        dropped, as it would be on arrival.
+        
+        Args:
+            timestamp (float): Time of the tick in seconds
+            price (float): Price at that time
+        """
+        latest = self.latest()
+        if latest is not None and timestamp < latest[0]:
+            ticks = self.ticks()
+            ticks.insert(bisect_right([tick_time for tick_time, _ in ticks], timestamp), (timestamp, price))
+            self.count = 0
+            for lows, highs in zip(self.min_ticks.values(), self.max_ticks.values()):
+                lows.clear()
+                highs.clear()
+            for tick in ticks[-self.capacity:]:
+                self._append(*tick)
+            return
+        self._append(timestamp, price)
+    
+    def _append(self, timestamp, price):
+        """Add a tick no older than the latest one."""
+        seq = self.count
+        slot = seq % self.capacity
+        self.timestamps[slot] = timestamp
+        self.prices[slot] = price
+        self.count += 1
+        oldest_kept = self.count - self.capacity
+        
+        for window in self.min_ticks:
+            lows = self.min_ticks[window]
+            while lows and self._price(lows[-1]) >= price:
+                lows.pop()
+            lows.append(seq)
+            
+            highs = self.max_ticks[window]
+            while highs and self._price(highs[-1]) <= price:
+                highs.pop()
+            highs.append(seq)
+            
+            cutoff = timestamp - window
+            for ticks in (lows, highs):
+                while ticks[0] < oldest_kept or self.timestamps[ticks[0] % self.capacity] < cutoff:
+                    ticks.popleft()
+    
+    def change(self, window, timestamp=None):
+        """
+        Get the largest percent move from any price in a window to the latest price.
+        
+        Args:
+            window (int): Window length in seconds
+            timestamp (float, optional): Read the window as of this time instead, with the last tick
+                at or before it as the latest price. Defaults to the latest tick.
+        
+        Returns:
+            tuple: (absolute percent change, reference price), or (None, None) if empty
+        """
+        if not self.count:
+            return None, None
+        
+        latest = self.latest()
+        if timestamp is None or timestamp >= latest[0]:
+            price = latest[1]
+            low = self._price(self.min_ticks[window][0])
+            high = self._price(self.max_ticks[window][0])
+        else:
+            # As of an earlier tick: scan the history the deques no longer describe
+            ticks = self.ticks()
+            ticks = ticks[:bisect_right([tick_time for tick_time, _ in ticks], timestamp)]
+            if not ticks:
+                return None, None
+            cutoff = ticks[-1][0] - window
+            prices = [tick_price for tick_time, tick_price in ticks if tick_time >= cutoff]
+            price, low, high = ticks[-1][1], min(prices), max(prices)
+        
+        rise = (price - low) / low * 100 if low else 0.0
+        drop = (high - price) / high * 100 if high else 0.0
+        if rise >= drop:
+            return rise, low
+        return drop, high
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Sample Pages
+Builds full-size coin pages for the benchmarks from the small sample page in fixtures/
+
+Usage:
+    python sample_pages.py [--output-directory pages]
+
+fixtures/pump_fun_coin.html holds the page layout with two trades and two
+comments. The sample pages repeat those rows up to the size of a busy coin
+page, about 350 KB, with fresh accounts, amounts and transaction signatures
+in every row so the page does not compress much better than a real one. Generation is seeded,
+so every run gives the same pages. The variants:
+    pump_fun_coin_padded       - stats block near the top, as on the live page
+    pump_fun_coin_late_stats   - stats block at the end of the page
+    pump_fun_coin_no_holders   - no holders label, so that field is never found
+
+The command writes the pages out as HTML files, e.g. to pass to the
+benchmarks with --page.
+"""
+
+import os
+import re
+import sys
+import json
+import random
+import argparse
+
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SAMPLE_FIXTURE = os.path.join(FIXTURES_DIRECTORY, "pump_fun_coin.html")
+SAMPLE_PAGES = ("pump_fun_coin_padded", "pump_fun_coin_late_stats", "pump_fun_coin_no_holders")
+SAMPLE_TRADES = 400  # Rows in the trades table
+SAMPLE_COMMENTS = 250  # Comments in the thread
+SAMPLE_DATA_TRADES = 300  # Trades in the embedded page data
+SAMPLE_SEED = 2024
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+# Addresses, signatures, short account names and amounts, which differ from row to row on a real page
+ROW_VALUES = re.compile(
+    f"[{BASE58_ALPHABET}]{{32,}}|(?<=>)[{BASE58_ALPHABET}]{{6}}(?=<)|(?<=>)[0-9][0-9,.]*(?=<)|(?<=\":)[0-9]+"
+)
+NEXT_DATA = re.compile(r'(<script id="__NEXT_DATA__" type="application/json">)(.*)(</script>)')
+
+def _fresh_value(value, rng):
+    """Return a random value shaped like the given one: a number of the same format, or a base58 string."""
+    if not value[0].isdigit() or not value.replace(",", "").replace(".", "").isdigit():
+        return "".join(rng.choice(BASE58_ALPHABET) for _ in value)
+    return "".join(
+        char if not char.isdigit() else rng.choice("123456789" if index == 0 else "0123456789")
+        for index, char in enumerate(value)
+    )
+
+def _fresh_values(text, rng):
+    """Replace the per-row values in a row with random ones of the same shape."""
+    return ROW_VALUES.sub(lambda match: _fresh_value(match.group(0), rng), text)
+
+def _repeat_rows(lines, prefix, count, rng):
+    """
+    Replace the run of lines starting with prefix by count rows cycled from it.
+    
+    Returns:
+        list: Lines of the page
+    """
+    rows = [index for index, line in enumerate(lines) if line.startswith(prefix)]
+    templates = [lines[index] for index in rows]
+    generated = [_fresh_values(templates[i % len(templates)], rng) for i in range(count)]
+    return lines[:rows[0]] + generated + lines[rows[-1] + 1:]
+
+def _repeat_data_trades(line, count, rng):
+    """Grow the trades list in the embedded page data to count entries."""
+    opening, payload, closing = NEXT_DATA.match(line).groups()
+    data = json.loads(payload)
+    templates = data["props"]["pageProps"]["trades"]
+    data["props"]["pageProps"]["trades"] = [
+        json.loads(_fresh_values(json.dumps(templates[i % len(templates)], separators=(',', ':')), rng)) for i in range(count)
+    ]
+    return opening + json.dumps(data, separators=(',', ':')) + closing
+
+def sample_page(name="pump_fun_coin_padded", seed=SAMPLE_SEED):
+    """
+    Build a full-size sample coin page.
+    
+    Args:
+        name (str): One of SAMPLE_PAGES
+        seed (int): Seed for the generated row values
+    
+    Returns:
+        str: Page HTML
+    """
+    if name not in SAMPLE_PAGES:
+        raise ValueError(f"Unknown sample page {name}")
+    with open(SAMPLE_FIXTURE, 'r', encoding='utf-8') as f:
+        lines = f.read().split("\n")
+    
+    rng = random.Random(seed)
+    lines = _repeat_rows(lines, '<tr class="border-b', SAMPLE_TRADES, rng)
+    lines = _repeat_rows(lines, '<div class="comment ', SAMPLE_COMMENTS, rng)
+    lines = [_repeat_data_trades(line, SAMPLE_DATA_TRADES, rng) if NEXT_DATA.match(line) else line for line in lines]
+    
+    # The stats block runs from its grid div to the first closing div after it
+    start = next(index for index, line in enumerate(lines) if line.startswith('<div class="grid'))
+    end = lines.index("</div>", start) + 1
+    stats = lines[start:end]
+    if name == "pump_fun_coin_late_stats":
+        del lines[start:end]
+        main_end = lines.index("</main></div>")
+        lines[main_end:main_end] = stats
+    elif name == "pump_fun_coin_no_holders":
+        lines = [line for line in lines if "Holders:" not in line]
+    return "\n".join(lines)
+
+def main():
+    """Write the sample pages to files."""
+    parser = argparse.ArgumentParser(description="Write the NeonX sample coin pages")
+    parser.add_argument("--output-directory", default=".", help="Directory to write the pages to")
+    args = parser.parse_args()
+    
+    os.makedirs(args.output_directory, exist_ok=True)
+    for name in SAMPLE_PAGES:
+        path = os.path.join(args.output_directory, f"{name}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(sample_page(name))
+        print(f"Wrote {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Snapshots
+Binary snapshot format for the community and alert data files
+
+Usage:
+    python snapshot.py to-json community_data.snap community_data.json
+    python snapshot.py from-json user_alerts.json user_alerts.snap [--compression zstd]
+
+A snapshot is a short header followed by the data serialized with pickle
+(restricted to plain data types on load) or msgpack, and optionally compressed
+with zlib or zstd. Set SNAPSHOT_FORMAT=binary to have the bot read and write snapshots
+instead of pretty-printed JSON; each store falls back to whichever of its
+JSON or snapshot files is newer, so switching formats needs no conversion.
+"""
+
+import io
+import os
+import sys
+import json
+import zlib
+import struct
+import pickle
+import logging
+import argparse
+from dotenv import load_dotenv
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; snapshots then always use pickle
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+# Load environment variables
+load_dotenv()
+
+# Enable logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "json")  # 'json' or 'binary'
+SNAPSHOT_SERIALIZER = os.getenv("SNAPSHOT_SERIALIZER", "pickle")  # 'pickle' or 'msgpack'
+SNAPSHOT_COMPRESSION = os.getenv("SNAPSHOT_COMPRESSION", "none")  # 'none', 'zlib' or 'zstd'
+SNAPSHOT_EXTENSION = ".snap"
+SNAPSHOT_MAGIC = b"NXSNAP"
+SNAPSHOT_VERSION = 1
+# Header: magic, version, serializer, compression, payload length, payload CRC32
+HEADER = struct.Struct(">6sBBBQI")
+SERIALIZERS = {"msgpack": 1, "pickle": 2}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2}
+# Types pickle may rebuild when loading a snapshot; anything else is rejected
+PICKLE_TYPES = {"dict", "list", "str", "bytes", "tuple", "int", "float", "bool"}
+
+class _PlainPickler(pickle.Pickler):
+    """Pickler that turns custom objects into plain data through a default hook."""
+    
+    def __init__(self, file, default):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.default = default
+    
+    def reducer_override(self, obj):
+        if self.default is None or type(obj).__module__ == "builtins":
+            return NotImplemented
+        value = self.default(obj)
+        return type(value), (value,)
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Unpickler that only rebuilds plain data types."""
+    
+    def find_class(self, module, name):
+        if module == "builtins" and name in PICKLE_TYPES:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Snapshot refers to {module}.{name}")
+
+def encode_snapshot(data, default=None, compression=None, serializer=None):
+    """
+    Encode data as a binary snapshot.
+    
+    Args:
+        data: JSON-like data
+        default (callable, optional): Converts other objects to JSON-like data, as in json.dumps
+        compression (str, optional): 'none', 'zlib' or 'zstd'. Defaults to SNAPSHOT_COMPRESSION.
+        serializer (str, optional): 'pickle' or 'msgpack'. Defaults to SNAPSHOT_SERIALIZER.
+    
+    Returns:
+        bytes: The snapshot
+    """
+    compression = compression or SNAPSHOT_COMPRESSION
+    if compression == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed, writing uncompressed snapshot")
+        compression = "none"
+    serializer = serializer or SNAPSHOT_SERIALIZER
+    if serializer == "msgpack" and msgpack is None:
+        logger.warning("msgpack is not installed, writing pickle snapshot")
+        serializer = "pickle"
+    
+    if serializer == "msgpack":
+        payload = msgpack.packb(data, default=default, use_bin_type=True)
+    else:
+        buffer = io.BytesIO()
+        _PlainPickler(buffer, default).dump(data)
+        payload = buffer.getvalue()
+    
+    if compression == "zlib":
+        payload = zlib.compress(payload, 1)
+    elif compression == "zstd":
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+    
+    header = HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SERIALIZERS[serializer], COMPRESSIONS[compression],
+        len(payload), zlib.crc32(payload)
+    )
+    return header + payload
+
+def decode_snapshot(content):
+    """
+    Decode a binary snapshot.
+    
+    Args:
+        content (bytes): The snapshot
+    
+    Returns:
+        The decoded data
+    
+    Raises:
+        ValueError: If the snapshot is truncated, corrupt or needs a missing library
+    """
+    if len(content) < HEADER.size:
+        raise ValueError("Snapshot is truncated")
+    magic, version, serializer, compression, length, checksum = HEADER.unpack_from(content)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError("Not a NeonX snapshot")
+    
+    payload = content[HEADER.size:]
+    if len(payload) != length or zlib.crc32(payload) != checksum:
+        raise ValueError("Snapshot is truncated or corrupt")
+    
+    if compression == COMPRESSIONS["zlib"]:
+        payload = zlib.decompress(payload)
+    elif compression == COMPRESSIONS["zstd"]:
+        if zstandard is None:
+            raise ValueError("Snapshot is zstd-compressed but zstandard is not installed")
+        payload = zstandard.ZstdDecompressor().decompress(payload, max_output_size=1 << 34)
+    
+    if serializer == SERIALIZERS["msgpack"]:
+        if msgpack is None:
+            raise ValueError("Snapshot uses msgpack but msgpack is not installed")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    return _PlainUnpickler(io.BytesIO(payload)).load()
+
+def snapshot_file(json_file):
+    """Return the snapshot file that goes with a JSON data file."""
+    return os.path.splitext(json_file)[0] + SNAPSHOT_EXTENSION
+
+def serialize_snapshot(data, default=None):
+    """
+    Serialize data in the configured format.
+    
+    Args:
+        data: JSON-like data
+        default (callable, optional): Converts other objects to JSON-like data
+    
+    Returns:
+        bytes: Pretty-printed JSON or a binary snapshot
+    """
+    if SNAPSHOT_FORMAT == "binary":
+        return encode_snapshot(data, default)
+    return json.dumps(data, indent=2, default=default).encode('utf-8')
+
+def deserialize_snapshot(content):
+    """
+    Deserialize the output of serialize_snapshot() in either format.
+    
+    Args:
+        content (bytes): JSON or a binary snapshot
+    
+    Returns:
+        The decoded data
+    """
+    if content.startswith(SNAPSHOT_MAGIC):
+        return decode_snapshot(content)
+    return json.loads(content)
+
+def write_snapshot(json_file, content):
+    """
+    Atomically write serialized data to the file for the configured format.
+    
+    Args:
+        json_file (str): JSON data file; binary snapshots go next to it
+        content (bytes): Output of serialize_snapshot()
+    """
+    path = snapshot_file(json_file) if SNAPSHOT_FORMAT == "binary" else json_file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def save_snapshot(json_file, data, default=None):
+    """Serialize and atomically write data in the configured format."""
+    write_snapshot(json_file, serialize_snapshot(data, default))
+
+def load_snapshot(json_file):
+    """
+    Load a data file, from its JSON or snapshot form, whichever is newer.
+    
+    Args:
+        json_file (str): JSON data file
+    
+    Returns:
+        The loaded data, or None if neither file exists
+    """
+    candidates = [path for path in (json_file, snapshot_file(json_file)) if os.path.exists(path)]
+    if not candidates:
+        return None
+    
+    path = max(candidates, key=os.path.getmtime)
+    with open(path, 'rb') as f:
+        return deserialize_snapshot(f.read())
+
+def main():
+    """Convert data files between JSON and snapshot form."""
+    parser = argparse.ArgumentParser(description="Convert NeonX data files between JSON and snapshots")
+    parser.add_argument("direction", choices=("to-json", "from-json"))
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--compression", choices=tuple(COMPRESSIONS), default=SNAPSHOT_COMPRESSION)
+    parser.add_argument("--serializer", choices=tuple(SERIALIZERS), default=SNAPSHOT_SERIALIZER)
+    args = parser.parse_args()
+    
+    with open(args.source, 'rb') as f:
+        content = f.read()
+    
+    if args.direction == "to-json":
+        output = json.dumps(decode_snapshot(content), indent=2).encode('utf-8')
+    else:
+        output = encode_snapshot(json.loads(content), compression=args.compression, serializer=args.serializer)
+    
+    with open(args.destination, 'wb') as f:
+        f.write(output)
+    print(f"Wrote {args.destination} ({len(output)} bytes)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Manager Stress Test
+Hammers AlertsManager and CommunityManager from many threads and checks their invariants
+
+Usage:
+    python stress_managers.py [--threads 8] [--ops 500] [--storage json,journal,sqlite] [--seed 42]
+
+Writers, readers and a price checker run concurrently against each storage
+mode in a temporary directory, with the interpreter switching threads far more
+often than usual. Afterwards the in-memory state is checked for consistency
+and compared with what a fresh manager loads from disk. Any problem is printed
+and the exit code is 1.
+"""
+
+import os
+import sys
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+
+ALERT_USERS = 200  # Few enough that threads keep working on the same users
+CHATS = 20
+MEMES = 30
+
+def run_threads(targets):
+    """
+    Run functions in parallel threads.
+    
+    Args:
+        targets (list): Functions to run
+    
+    Returns:
+        list: Exceptions raised by any of them
+    """
+    errors = []
+    
+    def wrap(target):
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=wrap, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+def stress_alerts(am, storage, threads, ops, seed):
+    """
+    Stress one alerts storage mode.
+    
+    Returns:
+        list: Problems found
+    """
+    for path in (am.ALERTS_FILE, am.ALERTS_JOURNAL_FILE, am.ALERTS_DB_FILE):
+        for stale in (path, os.path.splitext(path)[0] + ".snap"):
+            if os.path.exists(stale):
+                os.remove(stale)
+    manager = am.AlertsManager(storage=storage)
+    counts = {"added": 0, "removed": 0}
+    counts_lock = threading.Lock()
+    done = threading.Event()
+    problems = []
+    
+    def writer(index):
+        rng = random.Random(seed * 1000 + index)
+        added = removed = 0
+        for _ in range(ops):
+            user_id = rng.randrange(ALERT_USERS)
+            if rng.random() < 0.6:
+                alert_type = rng.choice(am.ALERT_TYPES)
+                threshold = round(rng.uniform(0.5, 1.5), 2) if alert_type in ('price_above', 'price_below') else rng.randrange(1, 20)
+                added += manager.add_alert(user_id, alert_type, threshold)
+            else:
+                user_alerts = manager.get_user_alerts(user_id)
+                if user_alerts:
+                    removed += manager.remove_alert(user_id, rng.choice(user_alerts)['id'])
+        with counts_lock:
+            counts["added"] += added
+            counts["removed"] += removed
+    
+    def reader():
+        rng = random.Random(seed)
+        while not done.is_set():
+            for user_id, user_alerts in manager.get_all_alerts().items():
+                if len({alert['id'] for alert in user_alerts}) != len(user_alerts):
+                    problems.append(f"{storage}: duplicate alert IDs in a snapshot for user {user_id}")
+            manager.get_user_alerts(rng.randrange(ALERT_USERS))
+    
+    def checker():
+        rng = random.Random(seed)
+        price = 1.0
+        while not done.is_set():
+            previous_price, price = price, max(0.4, min(1.6, price * rng.uniform(0.97, 1.03)))
+            manager.check_alerts(price, previous_price)
+    
+    def writers():
+        errors = run_threads([lambda index=index: writer(index) for index in range(threads)])
+        done.set()
+        if errors:
+            raise errors[0]
+    
+    for error in run_threads([writers, reader, reader, checker]):
+        problems.append(f"{storage}: {type(error).__name__}: {error}")
+    
+    # A final check must leave every price alert's flag matching the final price
+    final_price = 1.0
+    manager.check_alerts(final_price, final_price)
+    all_alerts = manager.get_all_alerts()
+    total = sum(len(user_alerts) for user_alerts in all_alerts.values())
+    if total != counts["added"] - counts["removed"]:
+        problems.append(f"{storage}: {total} alerts, expected {counts['added']} added - {counts['removed']} removed")
+    
+    for user_id, user_alerts in all_alerts.items():
+        keys = [(alert['type'], alert['threshold']) for alert in user_alerts]
+        if len(set(keys)) != len(keys):
+            problems.append(f"{storage}: duplicate alerts for user {user_id}")
+        for alert in user_alerts:
+            if alert['type'] == 'price_above' and alert['triggered'] != (final_price >= alert['threshold']):
+                problems.append(f"{storage}: alert {alert['id']} has a stale triggered flag")
+            if alert['type'] == 'price_below' and alert['triggered'] != (final_price <= alert['threshold']):
+                problems.append(f"{storage}: alert {alert['id']} has a stale triggered flag")
+    
+    if manager.index is not None:
+        stored = {alert['id'] for user_alerts in all_alerts.values() for alert in user_alerts}
+        indexed = {
+            alert_id
+            for index in manager.index.values()
+            for bucket in index.buckets.values()
+            for alert_id in bucket
+        }
+        if stored != indexed:
+            problems.append(f"{storage}: threshold index out of sync ({len(stored)} stored, {len(indexed)} indexed)")
+        for alert_type, index in manager.index.items():
+            if index.thresholds != sorted(index.buckets):
+                problems.append(f"{storage}: {alert_type} thresholds out of sync with buckets")
+        if sum(len(keys) for keys in manager.alert_ids.values()) != len(stored):
+            problems.append(f"{storage}: duplicate key sets out of sync")
+    
+    if manager.journal:
+        manager.journal.compact()
+    reloaded = am.AlertsManager(storage=storage).get_all_alerts()
+    normalize = lambda alerts: {
+        user_id: sorted((alert['id'], alert['type'], alert['threshold'], alert['triggered']) for alert in user_alerts)
+        for user_id, user_alerts in alerts.items()
+    }
+    if normalize(reloaded) != normalize(all_alerts):
+        problems.append(f"{storage}: alerts loaded from disk differ from memory")
+    return problems
+
+def stress_community(cm, threads, ops, seed):
+    """
+    Stress the community manager with write-behind flushing.
+    
+    Returns:
+        list: Problems found
+    """
+    manager = cm.CommunityManager(flush_interval=0.01, flush_mutations=50)
+    for meme in range(MEMES):
+        manager.add_meme(f"file{meme}", meme)
+    done = threading.Event()
+    problems = []
+    
+    def writer(index):
+        rng = random.Random(seed * 1000 + index)
+        for _ in range(ops):
+            user_id = rng.randrange(1000)
+            action = rng.random()
+            if action < 0.6:
+                manager.register_user_activity(user_id, f"user{user_id}", "Stress", None, chat_id=rng.randrange(CHATS))
+            elif action < 0.8:
+                manager.like_meme(rng.randrange(MEMES), user_id)
+            else:
+                manager.unlike_meme(rng.randrange(MEMES), user_id)
+    
+    def reader():
+        rng = random.Random(seed)
+        while not done.is_set():
+            chat_id = rng.randrange(CHATS)
+            manager.format_community_stats_message(chat_id)
+            manager.get_random_meme(chat_id)
+            for meme in manager.get_top_memes(10):
+                if meme["likes"] != len(meme["liked_by"]):
+                    problems.append(f"community: meme {meme['file_id']} copied mid-update")
+            manager.get_user_stats(rng.randrange(1000))
+    
+    def writers():
+        errors = run_threads([lambda index=index: writer(index) for index in range(threads)])
+        done.set()
+        if errors:
+            raise errors[0]
+    
+    for error in run_threads([writers, reader, reader]):
+        problems.append(f"community: {type(error).__name__}: {error}")
+    
+    memes = manager.data["memes"]
+    for index, meme in enumerate(memes):
+        if meme["likes"] != len(meme["liked_by"]):
+            problems.append(f"community: meme {index} has {meme['likes']} likes but {len(meme['liked_by'])} likers")
+    top = [meme["likes"] for meme in manager.get_top_memes(len(memes))]
+    if top != sorted((meme["likes"] for meme in memes), reverse=True):
+        problems.append("community: leaderboard out of order")
+    if manager.meme_sampler.total() != sum(meme["likes"] + 1 for meme in memes):
+        problems.append("community: meme sampler weights out of sync")
+    
+    stats = manager.get_community_stats()
+    chat_messages = sum(chat["messages"] for chat in manager.data["chats"].values())
+    if stats["total_messages"] != chat_messages:
+        problems.append(f"community: {stats['total_messages']} messages but {chat_messages} in chat rollups")
+    
+    manager.close()
+    reloaded = cm.CommunityManager(flush_interval=0)
+    if reloaded.get_community_stats()["total_messages"] != stats["total_messages"]:
+        problems.append("community: message count loaded from disk differs from memory")
+    if [meme["likes"] for meme in reloaded.data["memes"]] != [meme["likes"] for meme in memes]:
+        problems.append("community: likes loaded from disk differ from memory")
+    return problems
+
+def main():
+    """Run the stress test."""
+    parser = argparse.ArgumentParser(description="Stress test the NeonX managers")
+    parser.add_argument("--threads", type=int, default=8, help="Writer threads")
+    parser.add_argument("--ops", type=int, default=500, help="Operations per writer thread")
+    parser.add_argument("--storage", default="json,journal,sqlite", help="Comma-separated alert storage modes")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    
+    # Switch threads much more often than the default 5 ms to shake out races
+    sys.setswitchinterval(1e-5)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    work_dir = tempfile.mkdtemp(prefix="neonx-stress-")
+    os.chdir(work_dir)
+    try:
+        # The module-level singletons are created in the empty work directory
+        os.environ["ALERTS_STORAGE"] = "json"
+        os.environ["COMMUNITY_STORAGE"] = "file"
+        import alerts_manager as am
+        import community_manager as cm
+        
+        problems = []
+        for storage in args.storage.split(","):
+            print(f"Stressing alerts with {storage} storage...", file=sys.stderr)
+            problems.extend(stress_alerts(am, storage, args.threads, args.ops, args.seed))
+        print("Stressing community manager...", file=sys.stderr)
+        problems.extend(stress_community(cm, args.threads, args.ops, args.seed))
+    finally:
+        os.chdir("/")
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    for problem in problems:
+        print(f"PROBLEM: {problem}")
+    print("OK" if not problems else f"{len(problems)} problems found")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
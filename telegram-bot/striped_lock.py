@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX Striped Locks
+A fixed set of locks shared out by key hash
+"""
+
+import zlib
+import threading
+from contextlib import contextmanager
+
+class StripedLock:
+    """
+    A fixed number of locks, with each key always mapped to the same one.
+    
+    Operations on different keys rarely contend, while memory stays constant
+    however many keys there are. Code that needs several stripes at once must
+    take them through all() so they are always acquired in the same order.
+    """
+    
+    def __init__(self, stripes=64):
+        """
+        Initialize the locks.
+        
+        Args:
+            stripes (int): Number of locks
+        """
+        self.locks = [threading.RLock() for _ in range(stripes)]
+    
+    def lock(self, key):
+        """
+        Get the lock for a key.
+        
+        Args:
+            key: User ID, chat ID or other key; hashed by its string form
+        
+        Returns:
+            threading.RLock: The key's lock
+        """
+        return self.locks[zlib.crc32(str(key).encode('utf-8')) % len(self.locks)]
+    
+    @contextmanager
+    def all(self):
+        """Hold every stripe, e.g. to take a consistent snapshot."""
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self.locks):
+                lock.release()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NeonX User Store
+Compact in-memory user records and a lazily loaded sharded layout on disk
+"""
+
+import os
+import sys
+import logging
+from array import array
+from collections import OrderedDict
+from dotenv import load_dotenv
+from snapshot import load_snapshot, snapshot_file
+
+# Load environment variables
+load_dotenv()
+
+# Enable logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+USER_SHARDS = int(os.getenv("COMMUNITY_USER_SHARDS", "64"))
+SHARD_CACHE_SIZE = int(os.getenv("COMMUNITY_SHARD_CACHE", "16"))  # Shards kept in memory
+
+class UserStore:
+    """
+    Compact store of user records.
+    
+    Users get a dense number in order of arrival. Their fields live in parallel
+    columns indexed by that number: typed arrays for times and message counts,
+    and lists for names, with first and last names interned since many users
+    share them. A map from the integer Telegram user ID gives the number.
+    Compared with a dict of dicts keyed by ID strings this drops a dict, a key
+    string and two float objects per user.
+    """
+    
+    FIELDS = ("username", "first_name", "last_name", "first_seen", "last_active", "message_count")
+    
+    def __init__(self):
+        """Initialize an empty store."""
+        self.index = {}  # Integer user ID -> user number
+        self.user_ids = array('q')
+        self.usernames = []
+        self.first_names = []
+        self.last_names = []
+        self.first_seen = array('d')
+        self.last_active = array('d')
+        self.message_counts = array('q')
+    
+    def __len__(self):
+        """Return the number of users."""
+        return len(self.user_ids)
+    
+    def __contains__(self, user_id):
+        """Check whether a user is known."""
+        return int(user_id) in self.index
+    
+    @staticmethod
+    def _intern(name):
+        """Share one copy of common names."""
+        return sys.intern(name) if name else name
+    
+    def position(self, user_id):
+        """
+        Get a user's number.
+        
+        Args:
+            user_id (int or str): Telegram user ID
+        
+        Returns:
+            int: The user number, or None if the user is unknown
+        """
+        return self.index.get(int(user_id))
+    
+    def add(self, user_id, username, first_name, last_name, first_seen, last_active, message_count):
+        """
+        Add a new user.
+        
+        Returns:
+            int: The new user number
+        """
+        position = len(self.user_ids)
+        self.index[int(user_id)] = position
+        self.user_ids.append(int(user_id))
+        self.usernames.append(username)
+        self.first_names.append(self._intern(first_name))
+        self.last_names.append(self._intern(last_name))
+        self.first_seen.append(first_seen)
+        self.last_active.append(last_active)
+        self.message_counts.append(message_count)
+        return position
+    
+    def touch(self, position, current_time, username=None, first_name=None, last_name=None):
+        """
+        Record a message from a user, updating any names provided.
+        
+        Args:
+            position (int): User number
+            current_time (float): Time of the message in seconds
+        """
+        self.last_active[position] = current_time
+        self.message_counts[position] += 1
+        if username:
+            self.usernames[position] = username
+        if first_name:
+            self.first_names[position] = self._intern(first_name)
+        if last_name:
+            self.last_names[position] = self._intern(last_name)
+    
+    def record_activity(self, user_id, current_time, username=None, first_name=None, last_name=None):
+        """
+        Record a message from a user, adding the user if new.
+        
+        Args:
+            user_id (int or str): Telegram user ID
+            current_time (float): Time of the message in seconds
+        
+        Returns:
+            bool: True if the user is new
+        """
+        position = self.position(user_id)
+        if position is None:
+            self.add(user_id, username, first_name, last_name, current_time, current_time, 1)
+            return True
+        self.touch(position, current_time, username, first_name, last_name)
+        return False
+    
+    def get_dict(self, user_id):
+        """
+        Get a user's record in the data file format.
+        
+        Args:
+            user_id (int or str): Telegram user ID
+        
+        Returns:
+            dict: User fields by name, or None if the user is unknown
+        """
+        position = self.position(user_id)
+        return self.to_dict(position) if position is not None else None
+    
+    def to_dict(self, position):
+        """
+        Get a user's record in the data file format.
+        
+        Args:
+            position (int): User number
+        
+        Returns:
+            dict: User fields by name
+        """
+        return {
+            "username": self.usernames[position],
+            "first_name": self.first_names[position],
+            "last_name": self.last_names[position],
+            "first_seen": self.first_seen[position],
+            "last_active": self.last_active[position],
+            "message_count": self.message_counts[position]
+        }
+    
+    def copy(self):
+        """
+        Copy the store.
+        
+        The columns are copied as whole arrays and lists, which is far cheaper
+        than converting the users to dicts.
+        
+        Returns:
+            UserStore: Store unaffected by later changes to this one
+        """
+        copied = UserStore()
+        copied.index = dict(self.index)
+        copied.user_ids = self.user_ids[:]
+        copied.usernames = self.usernames[:]
+        copied.first_names = self.first_names[:]
+        copied.last_names = self.last_names[:]
+        copied.first_seen = self.first_seen[:]
+        copied.last_active = self.last_active[:]
+        copied.message_counts = self.message_counts[:]
+        return copied
+    
+    def recent_activity(self):
+        """Iterate over (user ID string, last active time) pairs."""
+        for position, user_id in enumerate(self.user_ids):
+            yield str(user_id), self.last_active[position]
+    
+    def to_json(self):
+        """
+        Convert the store to the data file format.
+        
+        Returns:
+            dict: User dicts keyed by user ID string
+        """
+        return {str(user_id): self.to_dict(position) for position, user_id in enumerate(self.user_ids)}
+    
+    @classmethod
+    def from_json(cls, users):
+        """
+        Create a store from the data file format.
+        
+        Args:
+            users (dict): User dicts keyed by user ID string
+        
+        Returns:
+            UserStore: The store
+        """
+        store = cls()
+        for user_id, user in users.items():
+            store.add(user_id, *(user.get(field) for field in cls.FIELDS))
+        return store
+
+class ShardedUserStore:
+    """
+    User records split by user ID into shard files that load on first use.
+    
+    At most cache_size shards are kept in memory, least recently used first
+    out. A changed shard that is evicted is kept aside until the next flush
+    writes it, so eviction never does disk I/O under the caller's lock and a
+    reload before the flush sees the latest data.
+    """
+    
+    def __init__(self, directory, shards=USER_SHARDS, cache_size=SHARD_CACHE_SIZE):
+        """
+        Initialize the store.
+        
+        Args:
+            directory (str): Directory holding the shard files
+            shards (int): Number of shards users are spread over
+            cache_size (int): Maximum number of shards loaded at once
+        """
+        self.directory = directory
+        self.shards = shards
+        self.cache_size = cache_size
+        self.loaded = OrderedDict()  # Shard number -> UserStore, least recently used first
+        self.dirty = set()  # Loaded shards changed since they were last serialized
+        self.unwritten = {}  # Shard number -> UserStore newer than its file, never changed again
+    
+    def shard_file(self, shard):
+        """Return the data file of a shard."""
+        return os.path.join(self.directory, f"users-{shard:03d}.json")
+    
+    def shard_of(self, user_id):
+        """Return the shard a user belongs to."""
+        return int(user_id) % self.shards
+    
+    def _shard(self, shard):
+        """Get a shard, loading it and evicting the coldest ones if needed."""
+        store = self.loaded.get(shard)
+        if store is not None:
+            self.loaded.move_to_end(shard)
+            return store
+        
+        if shard in self.unwritten:
+            store = self.unwritten[shard].copy()
+        else:
+            try:
+                store = UserStore.from_json(load_snapshot(self.shard_file(shard)) or {})
+            except Exception as e:
+                store = self._quarantine(shard, e)
+        self.loaded[shard] = store
+        
+        while len(self.loaded) > self.cache_size:
+            evicted, evicted_store = self.loaded.popitem(last=False)
+            if evicted in self.dirty:
+                self.dirty.discard(evicted)
+                self.unwritten[evicted] = evicted_store
+        return store
+    
+    def _quarantine(self, shard, error):
+        """
+        Move a shard's unreadable files aside and start the shard empty.
+        
+        The files are renamed with a .corrupt suffix rather than deleted, so the
+        users in them can be recovered by hand, and are never overwritten by a
+        later flush. Every other shard is unaffected.
+        
+        Returns:
+            UserStore: Empty store for the shard
+        """
+        json_file = self.shard_file(shard)
+        for path in (json_file, snapshot_file(json_file)):
+            if os.path.exists(path):
+                os.replace(path, path + ".corrupt")
+        logger.error(f"User shard {json_file} is unreadable ({error}); moved aside with a .corrupt suffix and started empty")
+        return UserStore()
+    
+    def record_activity(self, user_id, current_time, username=None, first_name=None, last_name=None):
+        """
+        Record a message from a user, adding the user if new.
+        
+        Returns:
+            bool: True if the user is new
+        """
+        shard = self.shard_of(user_id)
+        is_new = self._shard(shard).record_activity(user_id, current_time, username, first_name, last_name)
+        self.dirty.add(shard)
+        return is_new
+    
+    def get_dict(self, user_id):
+        """
+        Get a user's record in the data file format.
+        
+        Returns:
+            dict: User fields by name, or None if the user is unknown
+        """
+        return self._shard(self.shard_of(user_id)).get_dict(user_id)
+    
+    def import_users(self, users):
+        """
+        Spread users from the single-file format over the shards.
+        
+        Every shard is written, empty ones included, so files left by an
+        interrupted earlier import are replaced.
+        
+        Args:
+            users (dict): User dicts keyed by user ID string
+        """
+        shards = {}
+        for user_id, user in users.items():
+            shards.setdefault(self.shard_of(user_id), {})[user_id] = user
+        for shard in range(self.shards):
+            self.unwritten[shard] = UserStore.from_json(shards.get(shard, {}))
+    
+    def pending_writes(self):
+        """
+        Copy changed shards for writing.
+        
+        Only the columns are copied, so the caller can serialize the returned
+        stores after releasing its lock.
+        
+        Returns:
+            list: (shard, data file, UserStore) for every shard newer than its file
+        """
+        for shard in self.dirty:
+            self.unwritten[shard] = self.loaded[shard].copy()
+        self.dirty.clear()
+        return [(shard, self.shard_file(shard), content) for shard, content in self.unwritten.items()]
+    
+    def written(self, shard, store):
+        """Forget a store from pending_writes() once it is on disk, unless the shard changed again."""
+        if self.unwritten.get(shard) is store:
+            del self.unwritten[shard]